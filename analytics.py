@@ -0,0 +1,317 @@
+# analytics.py
+# Columnar, in-memory utilization analytics over timesheet_entries.
+#
+# Entries for a period are read through a raw DBAPI cursor straight into
+# NumPy column arrays (no ORM objects), cached per period and dropped again
+# whenever a session commits a change to timesheet_entries.
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import invalidation
+from extensions import db
+from models import TimesheetEntry, User, Team, team_members
+
+DAY = 86400
+FLAG_BILLABLE = 1
+FLAG_APPROVED = 2
+
+
+# ----------------------------------------
+# Periods
+# ----------------------------------------
+def parse_period(period):
+    """'2025-Q2' (quarter) or '2025-05' (month) -> (start, end) dates, end exclusive."""
+    if "-Q" in period.upper():
+        year, q = period.upper().split("-Q")
+        year, q = int(year), int(q)
+        if not 1 <= q <= 4:
+            raise ValueError(period)
+        start = date(year, 3 * (q - 1) + 1, 1)
+        end = date(year + 1, 1, 1) if q == 4 else date(year, 3 * q + 1, 1)
+        return start, end
+    start = datetime.strptime(period, "%Y-%m").date()
+    end = date(start.year + 1, 1, 1) if start.month == 12 else date(start.year, start.month + 1, 1)
+    return start, end
+
+
+def current_quarter(today=None):
+    today = today or date.today()
+    return f"{today.year}-Q{(today.month - 1) // 3 + 1}"
+
+
+def _epoch(d):
+    return int((datetime(d.year, d.month, d.day) - datetime(1970, 1, 1)).total_seconds())
+
+
+# ----------------------------------------
+# Column store
+# ----------------------------------------
+class EntryColumns:
+    """One period of timesheet_entries as parallel NumPy arrays."""
+
+    __slots__ = (
+        "period", "start_day", "end_day", "user_id", "project_id", "activity_id",
+        "start", "end", "duration", "flags", "loaded_at",
+    )
+
+    def __init__(self, period, start_day, end_day, rows):
+        self.period = period
+        self.start_day = start_day
+        self.end_day = end_day
+        arr = np.array(
+            rows,
+            dtype=[
+                ("user_id", np.int32),
+                ("project_id", np.int32),
+                ("activity_id", np.int32),
+                ("start", np.int64),
+                ("end", np.int64),
+                ("duration", np.float32),
+                ("flags", np.uint8),
+            ],
+        )
+        self.user_id = np.ascontiguousarray(arr["user_id"])
+        self.project_id = np.ascontiguousarray(arr["project_id"])
+        self.activity_id = np.ascontiguousarray(arr["activity_id"])
+        self.start = np.ascontiguousarray(arr["start"])
+        self.end = np.ascontiguousarray(arr["end"])
+        self.duration = np.ascontiguousarray(arr["duration"])
+        self.flags = np.ascontiguousarray(arr["flags"])
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.user_id)
+
+    @property
+    def nbytes(self):
+        return sum(
+            getattr(self, name).nbytes
+            for name in ("user_id", "project_id", "activity_id", "start", "end", "duration", "flags")
+        )
+
+    @property
+    def days(self):
+        return (self.end_day - self.start_day).days
+
+    def split_days(self):
+        """Split entries at midnight, clipped to the period.
+
+        Returns (row, day_index, hours) arrays with one element per entry-day
+        segment; `row` indexes back into the columns.
+        """
+        lo, hi = _epoch(self.start_day), _epoch(self.end_day)
+        start = np.maximum(self.start, lo)
+        end = np.minimum(self.end, hi)
+        keep = np.flatnonzero(end > start)
+        start, end = start[keep], end[keep]
+
+        first = start // DAY
+        last = (end - 1) // DAY
+        span = (last - first + 1).astype(np.int64)
+        row = np.repeat(keep, span)
+        # position of each segment within its entry: 0, 1, ... span-1
+        offset = np.arange(span.sum()) - np.repeat(np.cumsum(span) - span, span)
+        day = np.repeat(first, span) + offset
+        seg_start = np.maximum(np.repeat(start, span), day * DAY)
+        seg_end = np.minimum(np.repeat(end, span), (day + 1) * DAY)
+        hours = (seg_end - seg_start) / 3600.0
+        return row, (day - lo // DAY).astype(np.int32), hours
+
+
+def _true(dialect):
+    return "1" if dialect == "sqlite" else "TRUE"
+
+
+def _epoch_sql(column, dialect):
+    if dialect == "sqlite":
+        return f"CAST(strftime('%s', {column}) AS INTEGER)"
+    return f"CAST(EXTRACT(EPOCH FROM {column}) AS BIGINT)"
+
+
+def load_columns(period):
+    """Read one period's entries via a raw cursor into EntryColumns."""
+    start_day, end_day = parse_period(period)
+    engine = db.engine
+    dialect = engine.dialect.name
+    mark = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    sql = (
+        "SELECT user_id, project_id, activity_id, "
+        f"{_epoch_sql('start_time', dialect)}, {_epoch_sql('end_time', dialect)}, "
+        "duration_hours, "
+        f"(CASE WHEN COALESCE(is_billable, {_true(dialect)}) THEN {FLAG_BILLABLE} ELSE 0 END)"
+        f" + (CASE WHEN is_approved THEN {FLAG_APPROVED} ELSE 0 END) "
+        "FROM timesheet_entries "
+        f"WHERE start_time < {mark} AND end_time > {mark}"
+    )
+    lo = datetime.combine(start_day, datetime.min.time())
+    hi = datetime.combine(end_day, datetime.min.time())
+    # SQLite stores DATETIME as ISO text, so compare against text
+    params = (str(hi), str(lo)) if dialect == "sqlite" else (hi, lo)
+
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+    return EntryColumns(period, start_day, end_day, rows)
+
+
+# ----------------------------------------
+# Cache, dropped by local commits to timesheet_entries
+# ----------------------------------------
+class ColumnCache:
+    """Per-process LRU of EntryColumns keyed by period.
+
+    Commits that touch timesheet_entries in this process clear it; the TTL
+    bounds staleness from writes made by other worker processes.
+    """
+
+    def __init__(self, max_periods=8, ttl=300):
+        self.max_periods = max_periods
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, period, loader=load_columns):
+        with self._lock:
+            hit = self._items.get(period)
+            if hit is not None and time.monotonic() - hit.loaded_at < self.ttl:
+                self._items.move_to_end(period)
+                return hit
+            generation = self._generation
+        cols = loader(period)
+        with self._lock:
+            # a commit landed while we were loading: serve it, don't keep it
+            if generation == self._generation:
+                self._items[period] = cols
+                self._items.move_to_end(period)
+                while len(self._items) > self.max_periods:
+                    self._items.popitem(last=False)
+        return cols
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+
+
+cache = ColumnCache()
+invalidation.watch([TimesheetEntry], cache.invalidate)
+
+
+# ----------------------------------------
+# Vectorized reports
+# ----------------------------------------
+def user_day_matrix(cols, approved_only=False):
+    """Hours per user per day -> (user_ids, matrix[user, day], billable matrix)."""
+    row, day, hours = cols.split_days()
+    if approved_only:
+        ok = (cols.flags[row] & FLAG_APPROVED) > 0
+        row, day, hours = row[ok], day[ok], hours[ok]
+    user_ids, uidx = np.unique(cols.user_id[row], return_inverse=True)
+    shape = (len(user_ids), cols.days)
+    flat = uidx.astype(np.int64) * cols.days + day
+    total = np.bincount(flat, weights=hours, minlength=shape[0] * shape[1]).reshape(shape)
+    bill = (cols.flags[row] & FLAG_BILLABLE) > 0
+    billable = np.bincount(
+        flat[bill], weights=hours[bill], minlength=shape[0] * shape[1]
+    ).reshape(shape)
+    return user_ids, total, billable
+
+
+def team_billable_ratio(user_ids, total, billable, memberships):
+    """memberships: (team_id, user_id) pairs -> {team_id: (billable_h, total_h, ratio)}."""
+    if not len(memberships) or not len(user_ids):
+        return {}
+    per_user_total = total.sum(axis=1)
+    per_user_bill = billable.sum(axis=1)
+    pairs = np.asarray(memberships, dtype=np.int64)
+    team_ids, tidx = np.unique(pairs[:, 0], return_inverse=True)
+    pos = np.searchsorted(user_ids, pairs[:, 1])
+    pos = np.clip(pos, 0, len(user_ids) - 1)
+    present = user_ids[pos] == pairs[:, 1]
+    t_total = np.bincount(tidx[present], weights=per_user_total[pos[present]], minlength=len(team_ids))
+    t_bill = np.bincount(tidx[present], weights=per_user_bill[pos[present]], minlength=len(team_ids))
+    ratio = np.divide(t_bill, t_total, out=np.zeros_like(t_total), where=t_total > 0)
+    return {
+        int(t): (float(b), float(h), float(r))
+        for t, b, h, r in zip(team_ids, t_bill, t_total, ratio)
+    }
+
+
+def outlier_cells(user_ids, total, max_hours=12.0, z=3.5):
+    """User-days above `max_hours`, or with a robust z-score above `z`."""
+    worked = total[total > 0]
+    if not len(worked):
+        return []
+    median = np.median(worked)
+    mad = np.median(np.abs(worked - median)) or 1e-9
+    score = 0.6745 * (total - median) / mad
+    hit = (total > 0) & ((total > max_hours) | (score > z))
+    u, d = np.nonzero(hit)
+    return [
+        (int(user_ids[i]), int(j), float(total[i, j]), float(score[i, j]))
+        for i, j in zip(u, d)
+    ]
+
+
+def utilization(period, approved_only=False, max_hours=12.0):
+    """Heatmap + team ratios + outliers for a period, as plain Python data."""
+    cols = cache.get(period)
+    user_ids, total, billable = user_day_matrix(cols, approved_only=approved_only)
+
+    names = dict(
+        db.session.query(User.id, User.username)
+        .filter(User.id.in_(user_ids.tolist()))
+        .all()
+    )
+    teams = dict(db.session.query(Team.id, Team.name).all())
+    memberships = db.session.query(team_members.c.team_id, team_members.c.user_id).all()
+    ratios = team_billable_ratio(user_ids, total, billable, memberships)
+
+    days = [cols.start_day + timedelta(days=i) for i in range(cols.days)]
+    return {
+        "period": period,
+        "start": cols.start_day.isoformat(),
+        "end": cols.end_day.isoformat(),
+        "entries": len(cols),
+        "days": [d.isoformat() for d in days],
+        "users": [
+            {
+                "id": int(uid),
+                "username": names.get(int(uid), str(uid)),
+                "hours": round(float(total[i].sum()), 2),
+                "billable_hours": round(float(billable[i].sum()), 2),
+                "daily": np.round(total[i], 2).tolist(),
+            }
+            for i, uid in enumerate(user_ids)
+        ],
+        "teams": [
+            {
+                "id": tid,
+                "name": teams.get(tid, str(tid)),
+                "billable_hours": round(b, 2),
+                "hours": round(h, 2),
+                "billable_ratio": round(r, 4),
+            }
+            for tid, (b, h, r) in sorted(ratios.items(), key=lambda kv: teams.get(kv[0], ""))
+        ],
+        "outliers": [
+            {
+                "user_id": uid,
+                "username": names.get(uid, str(uid)),
+                "day": days[d].isoformat(),
+                "hours": round(h, 2),
+                "score": round(s, 2),
+            }
+            for uid, d, h, s in outlier_cells(user_ids, total, max_hours=max_hours)
+        ],
+    }
@@ -0,0 +1,131 @@
+# assets.py
+# Ahead-of-time Tailwind build into a content-hashed, precompressed CSS file.
+#
+#   flask assets build     # runs the vendored Tailwind CLI, no network needed
+#
+# Templates call asset_url("app.css"); until a build exists it returns None
+# and base.html falls back to the Tailwind CDN runtime.
+import glob
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import subprocess
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import with_appcontext
+
+from compression import accepts, brotli
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+SRC_CSS = os.path.join(ROOT, "static", "src", "tailwind.css")
+TAILWIND_CONFIG = os.path.join(ROOT, "tailwind.config.js")
+MANIFEST = "manifest.json"
+
+# hashed names never change content, so clients may keep them for a year
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _dist_dir(app):
+    return app.config["ASSETS_DIST_DIR"]
+
+
+def load_manifest(app):
+    path = os.path.join(_dist_dir(app), MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def asset_url(name):
+    hashed = current_app.extensions["assets"].get(name)
+    if hashed is None:
+        return None
+    return url_for("asset", filename=hashed)
+
+
+def serve_asset(filename):
+    dist = _dist_dir(current_app)
+    mimetype = mimetypes.guess_type(filename)[0]
+    variants = []
+    if brotli is not None and accepts(request, "br"):
+        variants.append(("br", ".br"))
+    if accepts(request, "gzip"):
+        variants.append(("gzip", ".gz"))
+    for coding, suffix in variants:
+        if os.path.isfile(os.path.join(dist, filename + suffix)):
+            response = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+            response.headers["Content-Encoding"] = coding
+            break
+    else:
+        response = send_from_directory(dist, filename, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = IMMUTABLE
+    return response
+
+
+def _write(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def build(app):
+    """Compile Tailwind, hash the output and write .gz/.br variants + manifest."""
+    binary = app.config["TAILWIND_BIN"]
+    if not os.path.isfile(binary):
+        raise click.ClickException(
+            f"Tailwind CLI not found at {binary}. Download the standalone "
+            "tailwindcss binary for your platform once, put it there (or set "
+            "TAILWIND_BIN) and rerun; the build itself needs no network."
+        )
+    dist = _dist_dir(app)
+    os.makedirs(dist, exist_ok=True)
+    raw = os.path.join(dist, "app.css.build")
+    subprocess.run(
+        [binary, "-c", TAILWIND_CONFIG, "-i", SRC_CSS, "-o", raw, "--minify"],
+        cwd=ROOT,
+        check=True,
+    )
+    with open(raw, "rb") as fh:
+        data = fh.read()
+    os.remove(raw)
+
+    hashed = f"app.{hashlib.sha256(data).hexdigest()[:12]}.css"
+    for old in glob.glob(os.path.join(dist, "app.*.css*")):
+        if not os.path.basename(old).startswith(hashed):
+            os.remove(old)
+    path = os.path.join(dist, hashed)
+    _write(path, data)
+    _write(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write(path + ".br", brotli.compress(data, quality=11))
+
+    manifest = {"app.css": hashed}
+    _write(os.path.join(dist, MANIFEST), json.dumps(manifest, indent=2).encode())
+    app.extensions["assets"] = manifest
+    return path, len(data)
+
+
+@click.group("assets")
+def assets_cli():
+    """Build self-hosted static assets."""
+
+
+@assets_cli.command("build")
+@with_appcontext
+def build_command():
+    """Compile templates' Tailwind classes into a hashed CSS file."""
+    path, size = build(current_app)
+    click.echo(f"{os.path.relpath(path, ROOT)} ({size} bytes)")
+
+
+def init_app(app):
+    app.extensions["assets"] = load_manifest(app)
+    app.add_url_rule("/assets/<path:filename>", "asset", serve_asset)
+    app.add_template_global(asset_url)
+    app.cli.add_command(assets_cli)
@@ -0,0 +1,86 @@
+"""Bytes sent and response time for /entries/all, before and after compression.
+
+Seeds a throwaway SQLite database, then fetches the page as an admin with
+no Accept-Encoding (what every client got before), gzip and brotli. Also
+reports which stylesheet the page references: the Tailwind CDN runtime
+(compiled in the browser on every view) or the prebuilt hashed CSS.
+
+    python benchmarks/compression.py [--entries 5000] [--runs 20] [--json out.json]
+
+"Transfer" is bytes / --mbps, a stand-in for time-to-render on the wire;
+browser paint time is not measured here.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app  # noqa: E402
+from benchmarks.seed import PASSWORD, seed  # noqa: E402
+from extensions import db  # noqa: E402
+
+ENCODINGS = {"identity": "", "gzip": "gzip", "br": "br, gzip"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--mbps", type=float, default=10.0, help="link speed for transfer estimate")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"})
+        with app.app_context():
+            seed(entries=args.entries)
+            db.session.remove()
+
+        client = app.test_client()
+        client.post("/login", data={"username": "admin", "password": PASSWORD})
+
+        results = {}
+        for label, header in ENCODINGS.items():
+            samples, size, coding = [], 0, None
+            for _ in range(args.runs):
+                t = time.perf_counter()
+                r = client.get("/entries/all", headers={"Accept-Encoding": header})
+                body = r.get_data()
+                samples.append((time.perf_counter() - t) * 1000)
+                size, coding = len(body), r.headers.get("Content-Encoding")
+            results[label] = {
+                "content_encoding": coding,
+                "bytes": size,
+                "server_ms_median": round(statistics.median(samples), 2),
+                "transfer_ms": round(size * 8 / (args.mbps * 1000), 2),
+            }
+
+        page = client.get("/entries/all").get_data(as_text=True)
+        css = re.search(r'href="(/assets/[^"]+\.css)"', page)
+        stylesheet = {"cdn_runtime": "cdn.tailwindcss.com" in page, "prebuilt": css.group(1) if css else None}
+        if css:
+            for label, header in ENCODINGS.items():
+                r = client.get(css.group(1), headers={"Accept-Encoding": header})
+                stylesheet[f"{label}_bytes"] = len(r.get_data())
+                stylesheet["cache_control"] = r.headers.get("Cache-Control")
+                r.close()
+
+    out = {"entries": args.entries, "runs": args.runs, "mbps": args.mbps,
+           "page": results, "stylesheet": stylesheet}
+    for label, r in results.items():
+        print(f"{label:<9} {r['bytes']:>9} B  server {r['server_ms_median']:>8.2f} ms  "
+              f"transfer {r['transfer_ms']:>8.2f} ms  ({r['content_encoding'] or 'none'})")
+    print(f"stylesheet: {json.dumps(stylesheet)}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(out, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
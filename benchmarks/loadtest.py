@@ -0,0 +1,406 @@
+"""End-to-end HTTP load test: role mixes against the app under a real WSGI server.
+
+Seeds a throwaway SQLite database, starts the app under gunicorn (using
+gunicorn.conf.py) or werkzeug's threaded server, and runs --vus virtual
+users for --duration seconds. Each virtual user logs in as a seeded account
+of its role and repeats that role's session over keep-alive HTTP:
+
+    user      open the entry form, search activities, create an entry, list own entries
+    teamlead  pending queue, approve up to two entries, team entries
+    admin     all entries, customers/activities lists, create a customer and an activity
+
+Reports throughput, p50/p95/p99 per route, the error rate (HTTP >= 400 or a
+failed connection) and the lock rate (requests failing with "database is
+locked" in the server log, per request). Results go to --json; with
+--compare BASELINE.json it exits 1 when throughput, any route's p95 or the
+error rate regressed by more than --tolerance.
+
+    python benchmarks/loadtest.py [--mix user=70,teamlead=20,admin=10] [--vus 40] [--duration 30]
+        [--server gunicorn] [--workers 2] [--threads 16] [--env WRITE_COALESCING=1]
+        [--json out.json] [--compare baseline.json]
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from benchmarks.seed import PASSWORD, seed  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Activity, Project, Team, User  # noqa: E402
+
+ROLES = ("user", "teamlead", "admin")
+SEARCH_TERMS = ("act", "activity 1", "project", "customer 2", "0.1", "pro 3")
+_APPROVE = re.compile(rb"/entries/(\d+)/approve")
+
+
+# ----------------------------------------
+# Dataset + server
+# ----------------------------------------
+def prepare(uri, args):
+    """Seed the database; returns what the sessions need to know about it."""
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri})
+    with app.app_context():
+        seed(users=args.accounts, leads=args.leads, entries=args.entries)
+        teams = dict(
+            db.session.query(User.username, Team.id).join(Team, Team.lead_id == User.id)
+        )
+        fixture = {
+            "activity_ids": [aid for (aid,) in db.session.query(Activity.id)],
+            "project_ids": [pid for (pid,) in db.session.query(Project.id)],
+            "lead_teams": teams,
+        }
+        db.session.remove()
+        db.engine.dispose()
+    return fixture
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, uri, port, log):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri)
+    env.update(kv.split("=", 1) for kv in args.env)
+    if args.server == "gunicorn":
+        env.update(
+            GUNICORN_BIND=f"127.0.0.1:{port}",
+            GUNICORN_WORKERS=str(args.workers),
+            GUNICORN_THREADS=str(args.threads),
+        )
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    else:
+        cmd = [sys.executable, "-c",
+               "import sys; from werkzeug.serving import run_simple; from wsgi import app; "
+               f"run_simple('127.0.0.1', {port}, app, threaded=True)"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=log)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}; see {log.name}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start within 30s")
+
+
+def stop_server(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# ----------------------------------------
+# Virtual users
+# ----------------------------------------
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # route -> [ms]
+        self.errors = {}  # route -> count
+        self._lock = threading.Lock()
+
+    def add(self, route, ms, ok):
+        with self._lock:
+            self.samples.setdefault(route, []).append(ms)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+
+class Client:
+    """One browser: a keep-alive connection and the session cookie."""
+
+    def __init__(self, port, recorder, timeout):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        self.cookie = None
+        self.recorder = recorder
+
+    def hit(self, route, method, path, form=None):
+        headers = {"Accept-Encoding": "gzip"}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        t = time.perf_counter()
+        try:
+            self.conn.request(method, path, body, headers)
+            r = self.conn.getresponse()
+            data = r.read()
+            status = r.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()  # reconnects on the next request
+            self.recorder.add(route, (time.perf_counter() - t) * 1000, False)
+            return None, b""
+        self.recorder.add(route, (time.perf_counter() - t) * 1000, status < 400)
+        for cookie in r.headers.get_all("Set-Cookie") or ():
+            if cookie.startswith("session="):
+                self.cookie = cookie.split(";", 1)[0]
+        if r.headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return status, data
+
+    def login(self, username):
+        status, _ = self.hit("POST /login", "POST", "/login",
+                             {"username": username, "password": PASSWORD})
+        return status == 302
+
+
+def user_session(c, rng, fx):
+    c.hit("GET /entries/new", "GET", "/entries/new")
+    q = urlencode({"q": rng.choice(SEARCH_TERMS)})
+    c.hit("GET /entries/activities/search", "GET", f"/entries/activities/search?{q}")
+    start = datetime(2026, 1, 1, 8) + timedelta(days=rng.randrange(365), minutes=15 * rng.randrange(32))
+    c.hit("POST /entries/new", "POST", "/entries/new", {
+        "activity_id": rng.choice(fx["activity_ids"]),
+        "start_time": start.isoformat(timespec="minutes"),
+        "end_time": (start + timedelta(minutes=15 * rng.randint(1, 16))).isoformat(timespec="minutes"),
+        "description": "load test",
+        "is_billable": "on",
+    })
+    c.hit("GET /entries", "GET", "/entries")
+
+
+def teamlead_session(c, rng, fx, team_id):
+    _, page = c.hit("GET /entries/pending", "GET", "/entries/pending")
+    # id 0 is the placeholder in the page's live-update script
+    ids = sorted({int(i) for i in _APPROVE.findall(page)} - {0})
+    for eid in rng.sample(ids, min(2, len(ids))):
+        c.hit("POST /entries/<id>/approve", "POST", f"/entries/{eid}/approve", {})
+    if team_id is not None:
+        c.hit("GET /teams/<id>/entries", "GET", f"/teams/{team_id}/entries")
+
+
+def admin_session(c, rng, fx):
+    c.hit("GET /entries/all", "GET", "/entries/all")
+    c.hit("GET /customers", "GET", "/customers")
+    tag = f"{os.getpid()}-{threading.get_ident()}-{rng.randrange(10**9)}"
+    c.hit("POST /customers/new", "POST", "/customers/new", {"name": f"Load {tag}"})
+    c.hit("GET /activities", "GET", "/activities")
+    c.hit("POST /activities/new", "POST", "/activities/new", {
+        "name": f"Load {tag}", "project_id": rng.choice(fx["project_ids"]), "is_billable": "on",
+    })
+
+
+def virtual_user(n, role, port, fx, args, recorder, ready, start, deadline):
+    rng = random.Random(args.seed * 1000 + n)
+    c = Client(port, recorder, args.timeout)
+    if role == "user":
+        username = f"user{n % args.accounts}"
+    elif role == "teamlead":
+        username = f"lead{n % args.leads}"
+    else:
+        username = "admin"
+    logged_in = c.login(username)
+    ready.release()
+    if not logged_in:
+        return
+    start.wait()
+    while time.monotonic() < deadline[0]:
+        if role == "user":
+            user_session(c, rng, fx)
+        elif role == "teamlead":
+            teamlead_session(c, rng, fx, fx["lead_teams"].get(username))
+        else:
+            admin_session(c, rng, fx)
+        if args.think_ms:
+            time.sleep(rng.expovariate(1000 / args.think_ms))
+    c.conn.close()
+
+
+def assign_roles(mix, vus, seed):
+    """Deterministic role per virtual user, proportional to the mix weights.
+
+    Largest remainder: every role gets the floor of its share, and the
+    slots left over go to the biggest fractional parts, so the counts
+    always add up to `vus` without starving the roles listed last.
+    """
+    total = sum(mix.values())
+    shares = {role: vus * mix.get(role, 0) / total for role in ROLES}
+    counts = {role: int(share) for role, share in shares.items()}
+    left = vus - sum(counts.values())
+    for role in sorted(ROLES, key=lambda r: counts[r] - shares[r])[:left]:
+        counts[role] += 1
+    roles = [role for role in ROLES for _ in range(counts[role])]
+    random.Random(seed).shuffle(roles)
+    return roles
+
+
+# ----------------------------------------
+# Report
+# ----------------------------------------
+def _pct(sorted_ms, q):
+    return sorted_ms[min(len(sorted_ms) - 1, int(q / 100 * len(sorted_ms)))]
+
+
+def summarize(recorder, elapsed, locks):
+    routes = {}
+    for route, ms in sorted(recorder.samples.items()):
+        ms = sorted(ms)
+        errors = recorder.errors.get(route, 0)
+        routes[route] = {
+            "requests": len(ms),
+            "errors": errors,
+            "rps": round(len(ms) / elapsed, 2),
+            "p50_ms": round(statistics.median(ms), 2),
+            "p95_ms": round(_pct(ms, 95), 2),
+            "p99_ms": round(_pct(ms, 99), 2),
+        }
+    measured = {r: v for r, v in routes.items() if r != "POST /login"}
+    requests = sum(v["requests"] for v in measured.values())
+    errors = sum(v["errors"] for v in measured.values())
+    every = sorted(ms for r, s in recorder.samples.items() if r != "POST /login" for ms in s)
+    return {
+        "seconds": round(elapsed, 2),
+        "requests": requests,
+        "rps": round(requests / elapsed, 2) if elapsed else 0,
+        "error_rate": round(errors / requests, 5) if requests else 0,
+        "lock_errors": locks,
+        "lock_rate": round(locks / requests, 5) if requests else 0,
+        "p50_ms": round(statistics.median(every), 2) if every else None,
+        "p95_ms": round(_pct(every, 95), 2) if every else None,
+        "p99_ms": round(_pct(every, 99), 2) if every else None,
+    }, routes
+
+
+def compare(result, baseline, tolerance):
+    """Regressions of `result` against `baseline` beyond `tolerance` (a fraction)."""
+    problems = []
+    cur, base = result["summary"], baseline["summary"]
+    if base["rps"] and cur["rps"] < base["rps"] * (1 - tolerance):
+        problems.append(f"throughput {base['rps']} -> {cur['rps']} req/s")
+    if cur["error_rate"] > base["error_rate"] + tolerance / 100:
+        problems.append(f"error rate {base['error_rate']} -> {cur['error_rate']}")
+    for route, r in result["routes"].items():
+        b = baseline["routes"].get(route)
+        if b and r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            problems.append(f"{route} p95 {b['p95_ms']} -> {r['p95_ms']} ms")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", default="user=70,teamlead=20,admin=10",
+                        help="role weights, e.g. user=70,teamlead=20,admin=10")
+    parser.add_argument("--vus", type=int, default=40, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between sessions")
+    parser.add_argument("--server", choices=("gunicorn", "werkzeug"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra server environment (repeatable)")
+    parser.add_argument("--accounts", type=int, default=50, help="seeded ROLE_USER accounts")
+    parser.add_argument("--leads", type=int, default=5)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    mix = {k.strip(): float(v) for k, v in (part.split("=") for part in args.mix.split(","))}
+    unknown = set(mix) - set(ROLES)
+    if unknown:
+        parser.error(f"unknown role(s) in --mix: {', '.join(sorted(unknown))}")
+    roles = assign_roles(mix, args.vus, args.seed)
+    for role in ROLES:
+        if mix.get(role, 0) > 0 and role not in roles:
+            print(f"warning: --vus {args.vus} leaves no virtual user for {role}; "
+                  "its routes are not measured", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite:///{os.path.join(tmp, 'load.sqlite')}"
+        fx = prepare(uri, args)
+        port = _free_port()
+        log_path = os.path.join(tmp, "server.log")
+        with open(log_path, "w") as log:
+            server = start_server(args, uri, port, log)
+            recorder = Recorder()
+            ready, start, deadline = threading.Semaphore(0), threading.Event(), [0.0]
+            vus = [
+                threading.Thread(target=virtual_user,
+                                 args=(n, role, port, fx, args, recorder, ready, start, deadline))
+                for n, role in enumerate(roles)
+            ]
+            try:
+                for th in vus:
+                    th.start()
+                for _ in vus:
+                    ready.acquire()  # logins (password checks) finish before the clock starts
+                t = time.perf_counter()
+                deadline[0] = time.monotonic() + args.duration
+                start.set()
+                for th in vus:
+                    th.join()
+                elapsed = time.perf_counter() - t
+            finally:
+                stop_server(server)
+        with open(log_path, errors="replace") as log:
+            # one per failed request: the traceback also names the chained
+            # sqlite3.OperationalError, so match only SQLAlchemy's final line
+            locks = sum(
+                line.startswith("sqlalchemy.exc.OperationalError")
+                and "database is locked" in line
+                for line in log
+            )
+
+    summary, routes = summarize(recorder, elapsed, locks)
+    result = {
+        "config": {
+            "mix": mix, "vus": args.vus, "duration": args.duration, "think_ms": args.think_ms,
+            "server": args.server, "workers": args.workers, "threads": args.threads,
+            "env": args.env, "accounts": args.accounts, "leads": args.leads,
+            "entries": args.entries, "seed": args.seed,
+        },
+        "roles": {role: roles.count(role) for role in ROLES},
+        "summary": summary,
+        "routes": routes,
+    }
+
+    print(f"{summary['requests']} requests in {summary['seconds']} s: {summary['rps']} req/s, "
+          f"errors {summary['error_rate']:.2%}, locks {summary['lock_rate']:.2%} "
+          f"(p50 {summary['p50_ms']} / p95 {summary['p95_ms']} / p99 {summary['p99_ms']} ms)")
+    print(f"{'route':<34}{'reqs':>7}{'err':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for route, r in routes.items():
+        print(f"{route:<34}{r['requests']:>7}{r['errors']:>6}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            problems = compare(result, json.load(fh), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION: {p}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Deterministic synthetic dataset for the benchmarks.
+
+Every seeded account uses the password "pw". Usernames: admin, lead<N>,
+user<N>. Each lead runs one team of `users // leads` members.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User, Customer, Project, Activity, TimesheetEntry, Team, team_members
+
+PASSWORD = "pw"
+
+
+def seed(users=50, leads=5, customers=10, projects=3, activities=4, entries=5000,
+         start=datetime(2025, 4, 1), days=90, rng_seed=1):
+    """Drop and recreate all tables, then fill them; call inside an app context."""
+    rng = random.Random(rng_seed)
+    db.drop_all()
+    db.create_all()
+
+    pw = generate_password_hash(PASSWORD)  # one hash, shared: seeding is not a hashing benchmark
+    accounts = [{"username": "admin", "password_hash": pw, "role": "ROLE_ADMIN", "is_approved": True}]
+    accounts += [
+        {"username": f"lead{i}", "password_hash": pw, "role": "ROLE_TEAMLEAD", "is_approved": True}
+        for i in range(leads)
+    ]
+    accounts += [
+        {"username": f"user{i}", "password_hash": pw, "role": "ROLE_USER", "is_approved": True}
+        for i in range(users)
+    ]
+    db.session.execute(insert(User), accounts)
+    ids = dict(db.session.query(User.username, User.id))
+    user_ids = [ids[f"user{i}"] for i in range(users)]
+
+    db.session.execute(
+        insert(Team), [{"name": f"Team {i}", "lead_id": ids[f"lead{i}"]} for i in range(leads)]
+    )
+    team_ids = [tid for (tid,) in db.session.query(Team.id).order_by(Team.id)]
+    if team_ids:
+        db.session.execute(
+            insert(team_members),
+            [{"team_id": team_ids[n % len(team_ids)], "user_id": uid} for n, uid in enumerate(user_ids)],
+        )
+
+    db.session.execute(insert(Customer), [{"name": f"Customer {c}"} for c in range(customers)])
+    cust_ids = [cid for (cid,) in db.session.query(Customer.id)]
+    db.session.execute(
+        insert(Project),
+        [{"name": f"Project {c}.{p}", "customer_id": cid}
+         for c, cid in enumerate(cust_ids) for p in range(projects)],
+    )
+    proj_ids = [pid for (pid,) in db.session.query(Project.id)]
+    db.session.execute(
+        insert(Activity),
+        [{"name": f"Activity {p}.{a}", "project_id": pid, "is_billable": a % 4 != 3}
+         for p, pid in enumerate(proj_ids) for a in range(activities)],
+    )
+    acts = db.session.query(Activity.id, Activity.project_id).all()
+
+    rows = []
+    for _ in range(entries):
+        act_id, proj_id = rng.choice(acts)
+        s = start + timedelta(days=rng.randrange(days), hours=rng.randrange(7, 18))
+        hours = rng.choice((0.5, 1, 1.5, 2, 3, 4))
+        rows.append({
+            "user_id": rng.choice(user_ids),
+            "project_id": proj_id,
+            "activity_id": act_id,
+            "start_time": s,
+            "end_time": s + timedelta(hours=hours),
+            "duration_hours": hours,
+            "is_billable": rng.random() < 0.8,
+            "description": "Synthetic entry",
+            "is_approved": rng.random() < 0.6,
+        })
+    if rows:
+        db.session.execute(insert(TimesheetEntry), rows)
+    db.session.commit()
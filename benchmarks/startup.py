@@ -0,0 +1,58 @@
+"""Startup-time benchmark for the application factory.
+
+Each phase runs in a fresh interpreter so module caches don't hide import
+cost, timed from outside: the wall time of the whole process, interpreter
+start-up included. Reports min/median per phase in milliseconds.
+
+    python benchmarks/startup.py [--runs 20] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PHASES = {
+    # bare interpreter start-up and exit, to subtract from the rest
+    "python": "pass",
+    "import app": "import app",
+    "create_app()": "import app; app.create_app()",
+    "first request": (
+        "import app; a = app.create_app(); "
+        "a.test_client().get('/login')"
+    ),
+}
+
+
+def measure(code, runs):
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, check=True)
+        samples.append((time.perf_counter() - t) * 1000)
+    return {
+        "min_ms": round(min(samples), 2),
+        "median_ms": round(statistics.median(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {name: measure(code, args.runs) for name, code in PHASES.items()}
+    for name, r in results.items():
+        print(f"{name:<15} min {r['min_ms']:>8.2f} ms   median {r['median_ms']:>8.2f} ms")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"runs": args.runs, "phases": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
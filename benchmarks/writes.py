@@ -0,0 +1,140 @@
+"""Write throughput and latency under concurrent load, with and without WRITE_COALESCING.
+
+Seeds a throwaway SQLite database per mode, forks --procs worker processes
+(like gunicorn workers) each running --threads logged-in users, and has every
+user POST /entries/new --writes times as fast as it can. Reports commits per
+second, p50/p95/p99 request latency, and requests that failed (typically
+"database is locked" once a writer waits past SQLite's busy timeout).
+
+    python benchmarks/writes.py [--procs 2] [--threads 16] [--writes 50] [--window-ms 5] [--json out.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app  # noqa: E402
+from benchmarks.seed import PASSWORD, seed  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Activity  # noqa: E402
+
+MODES = {"direct": False, "coalesced": True}
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+
+def _worker(uri, coalesce, window_ms, first_user, threads, writes, activity_id, start, out):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "WRITE_COALESCING": coalesce,
+        "WRITE_QUEUE_WINDOW_MS": window_ms,
+    })
+    clients = []
+    for i in range(threads):
+        client = app.test_client()
+        client.post("/login", data={"username": f"user{first_user + i}", "password": PASSWORD})
+        clients.append(client)
+
+    latencies, errors = [], []
+
+    def run(client, n):
+        day = datetime(2026, 1, 1) + timedelta(days=n)
+        for k in range(writes):
+            s = day + timedelta(minutes=k)
+            t = time.perf_counter()
+            try:
+                r = client.post("/entries/new", data={
+                    "activity_id": activity_id,
+                    "start_time": s.isoformat(),
+                    "end_time": (s + timedelta(minutes=30)).isoformat(),
+                })
+                ok = r.status_code == 302
+            except Exception:
+                ok = False
+            (latencies if ok else errors).append((time.perf_counter() - t) * 1000)
+
+    start.wait()
+    pool = [threading.Thread(target=run, args=(c, i)) for i, c in enumerate(clients)]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    out.put((latencies, len(errors)))
+
+
+def bench(mode, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"
+        app = create_app({"SQLALCHEMY_DATABASE_URI": uri})
+        with app.app_context():
+            seed(users=args.procs * args.threads, leads=1, entries=0)
+            activity_id = db.session.query(Activity.id).first()[0]
+            db.session.remove()
+            db.engine.dispose()
+
+        ctx = multiprocessing.get_context("fork")
+        start, out = ctx.Event(), ctx.Queue()
+        procs = [
+            ctx.Process(target=_worker, args=(
+                uri, MODES[mode], args.window_ms, p * args.threads, args.threads,
+                args.writes, activity_id, start, out,
+            ))
+            for p in range(args.procs)
+        ]
+        for p in procs:
+            p.start()
+        time.sleep(1.0)  # let every worker finish logging in
+        t = time.perf_counter()
+        start.set()
+        latencies, errors = [], 0
+        for _ in procs:
+            lat, err = out.get()
+            latencies += lat
+            errors += err
+        elapsed = time.perf_counter() - t
+        for p in procs:
+            p.join()
+
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--procs", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=50, help="entries posted per user")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {mode: bench(mode, args) for mode in MODES}
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['writes_per_s']:>8.1f} writes/s  p50 {r['p50_ms']} ms  "
+              f"p95 {r['p95_ms']} ms  p99 {r['p99_ms']} ms  errors {r['errors']}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"procs": args.procs, "threads": args.threads, "writes": args.writes,
+                       "window_ms": args.window_ms, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
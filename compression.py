@@ -0,0 +1,47 @@
+# compression.py
+# gzip/brotli for dynamic HTML/JSON responses above a size threshold.
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional: fall back to gzip only
+    brotli = None
+
+
+def accepts(request, coding):
+    return coding in request.accept_encodings and request.accept_encodings[coding] > 0
+
+
+def init_app(app):
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        cfg = app.config
+        if (
+            response.direct_passthrough  # files: precompressed variants instead
+            or response.is_streamed  # SSE and other generators
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in cfg["COMPRESS_MIMETYPES"]
+        ):
+            return response
+        data = response.get_data()
+        if len(data) < cfg["COMPRESS_MIN_SIZE"]:
+            return response
+
+        if brotli is not None and accepts(request, "br"):
+            body = brotli.compress(data, quality=cfg["COMPRESS_BR_QUALITY"])
+            coding = "br"
+        elif accepts(request, "gzip"):
+            body = gzip.compress(data, compresslevel=cfg["COMPRESS_GZIP_LEVEL"], mtime=0)
+            coding = "gzip"
+        else:
+            response.vary.add("Accept-Encoding")
+            return response
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = coding
+        response.vary.add("Accept-Encoding")
+        return response
@@ -0,0 +1,83 @@
+# config.py
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+
+class Config:
+    SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_key")
+
+    # Database setup (SQLite; SQLALCHEMY_DATABASE_URI in the environment overrides)
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(basedir, 'db.sqlite')}"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Single-writer mode (see writer.py): commits from concurrent requests are
+    # queued and coalesced into one transaction per window; also turns on WAL
+    WRITE_COALESCING = os.getenv("WRITE_COALESCING", "").lower() in ("1", "true", "yes")
+    WRITE_QUEUE_WINDOW_MS = float(os.getenv("WRITE_QUEUE_WINDOW_MS", "5"))
+    WRITE_QUEUE_MAX_BATCH = 200
+    WRITE_QUEUE_TIMEOUT = 30
+
+    # Static assets: `flask assets build` runs the vendored Tailwind CLI
+    TAILWIND_BIN = os.getenv("TAILWIND_BIN", os.path.join(basedir, "tools", "tailwindcss"))
+    ASSETS_DIST_DIR = os.path.join(basedir, "static", "dist")
+
+    # Response compression (HTML/JSON above COMPRESS_MIN_SIZE bytes)
+    COMPRESS_MIMETYPES = ("text/html", "application/json")
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BR_QUALITY = 5
+
+    # Server-Sent Events (pending approvals): relay poll interval and
+    # keepalive in seconds, per-connection buffer, feed retention
+    SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", "1.0"))
+    SSE_KEEPALIVE = 15
+    SSE_QUEUE_SIZE = 256
+    SSE_EVENT_RETENTION_HOURS = 24
+
+    # Entry-form typeahead: default result count, usage window (days) for
+    # ranking and the team-project boost, team-project cache lifetime and the
+    # longest the catalog index may miss other processes' changes (seconds)
+    TYPEAHEAD_LIMIT = 10
+    TYPEAHEAD_RECENT_DAYS = 90
+    TYPEAHEAD_SCOPE_TTL = 300
+    TYPEAHEAD_INDEX_TTL = int(os.getenv("TYPEAHEAD_INDEX_TTL", "30"))
+
+    # Weekly grid: new cells become entries starting at this hour
+    WEEK_GRID_DAY_START_HOUR = 9
+
+    # Live timers: seconds between registry syncs and between checkpoints of
+    # a running timer's hours; running timers not checkpointed for
+    # TIMER_STALE_AFTER seconds (server down) are paused at their last one
+    TIMER_SYNC_SECONDS = 5
+    TIMER_CHECKPOINT_SECONDS = int(os.getenv("TIMER_CHECKPOINT_SECONDS", "300"))
+    TIMER_STALE_AFTER = int(os.getenv("TIMER_STALE_AFTER", "1800"))
+
+    # Team membership pages: users per picker page, and how long (seconds)
+    # member counts cached for the teams list may miss other processes' changes
+    TEAM_PICKER_PAGE_SIZE = 50
+    TEAM_COUNTS_TTL = int(os.getenv("TEAM_COUNTS_TTL", "60"))
+
+    # Month-end invoices
+    INVOICE_DIR = os.getenv("INVOICE_DIR", os.path.join(basedir, "invoices"))
+    INVOICE_WORKERS = int(os.getenv("INVOICE_WORKERS", "0")) or None
+
+    # Bulk user provisioning: password-hashing processes (default: one per CPU)
+    PROVISION_WORKERS = int(os.getenv("PROVISION_WORKERS", "0")) or None
+
+    # Utilization analytics: seconds a cached period may serve writes made by
+    # other processes, and the day total flagged as an outlier regardless
+    ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+    ANALYTICS_MAX_DAY_HOURS = float(os.getenv("ANALYTICS_MAX_DAY_HOURS", "12"))
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
@@ -0,0 +1,236 @@
+# events.py
+# Server-Sent Events for team leads: new, approved and deleted timesheet
+# entries.
+#
+# Session hooks append rows to entry_events inside the writing transaction
+# and, after commit, wake this process's relay thread. The relay reads new
+# events (one query per round, however many clients are connected) and fans
+# them out to per-connection queues, keeping only the events for teams the
+# connected lead runs. Because the feed lives in the database, commits made
+# by other worker processes reach every process's clients too.
+import json
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import EntryEvent, TimesheetEntry, User, Project, Activity, team_members
+
+_PENDING = "entry_events_pending"
+
+
+# ----------------------------------------
+# Capture (runs inside the writer's transaction)
+# ----------------------------------------
+def record(session, rows):
+    """Append {"kind", "entry_id", "user_id"} rows to the feed.
+
+    Also for bulk code paths that write timesheet_entries with Core
+    statements and so never pass through the ORM flush.
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    session.connection().execute(
+        insert(EntryEvent.__table__), [dict(r, created_at=now) for r in rows]
+    )
+    session.info[_PENDING] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_entry_changes(session, flush_context):
+    rows = []
+    for obj in session.new:
+        if isinstance(obj, TimesheetEntry):
+            rows.append({"kind": "created", "entry_id": obj.id, "user_id": obj.user_id})
+    for obj in session.dirty:
+        if isinstance(obj, TimesheetEntry):
+            hist = inspect(obj).attrs.is_approved.history
+            if hist.added and hist.added[0] and True not in (hist.deleted or ()):
+                rows.append({"kind": "approved", "entry_id": obj.id, "user_id": obj.user_id})
+    for obj in session.deleted:
+        if isinstance(obj, TimesheetEntry):
+            rows.append({"kind": "deleted", "entry_id": obj.id, "user_id": obj.user_id})
+    record(session, rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_relay(session):
+    if session.info.pop(_PENDING, False):
+        broker.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_events(session):
+    session.info.pop(_PENDING, None)
+
+
+# ----------------------------------------
+# Relay + fan-out
+# ----------------------------------------
+def fetch_events(conn, after_id, team_ids=None, limit=500):
+    """Events with id > after_id, joined to the entry and the user's teams.
+
+    The entry behind a "deleted" event is gone, so its fields come back empty.
+    """
+    ids = select(EntryEvent.id).where(EntryEvent.id > after_id).order_by(EntryEvent.id)
+    if team_ids is not None:
+        ids = ids.where(
+            EntryEvent.user_id.in_(
+                select(team_members.c.user_id).where(team_members.c.team_id.in_(team_ids))
+            )
+        )
+    ids = ids.limit(limit).subquery()
+    q = (
+        select(
+            EntryEvent.id, EntryEvent.kind, EntryEvent.entry_id, EntryEvent.user_id,
+            User.username, Project.name, Activity.name,
+            TimesheetEntry.start_time, TimesheetEntry.end_time,
+            TimesheetEntry.duration_hours, team_members.c.team_id,
+        )
+        .join(ids, ids.c.id == EntryEvent.id)
+        .outerjoin(TimesheetEntry, TimesheetEntry.id == EntryEvent.entry_id)
+        .join(User, User.id == EntryEvent.user_id)
+        .outerjoin(Project, Project.id == TimesheetEntry.project_id)
+        .outerjoin(Activity, Activity.id == TimesheetEntry.activity_id)
+        .join(team_members, team_members.c.user_id == EntryEvent.user_id)
+        .order_by(EntryEvent.id)
+    )
+    events = {}
+    for (eid, kind, entry_id, user_id, username, project, activity,
+         start, end, hours, team_id) in conn.execute(q):
+        ev = events.get(eid)
+        if ev is None:
+            ev = events[eid] = {
+                "id": eid,
+                "kind": kind,
+                "entry_id": entry_id,
+                "user_id": user_id,
+                "user": username,
+                "project": project,
+                "activity": activity,
+                "start": start.strftime("%Y-%m-%d %H:%M") if start else None,
+                "end": end.strftime("%Y-%m-%d %H:%M") if end else None,
+                "duration": round(hours, 2) if hours is not None else None,
+                "teams": set(),
+            }
+        ev["teams"].add(team_id)
+    return list(events.values())
+
+
+class Subscriber:
+    __slots__ = ("team_ids", "queue", "seen_id")
+
+    def __init__(self, team_ids, maxsize):
+        self.team_ids = frozenset(team_ids)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.seen_id = 0
+
+
+class Broker:
+    """Per-process relay thread + subscriber registry."""
+
+    def __init__(self):
+        self._subs = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._last_id = None
+        self._last_prune = 0.0
+
+    def wake(self):
+        self._wake.set()
+
+    def subscribe(self, app, team_ids, last_event_id=None):
+        sub = Subscriber(team_ids, app.config["SSE_QUEUE_SIZE"])
+        if last_event_id is not None and sub.team_ids:
+            # reconnect: replay what the client missed before going live
+            with db.engine.connect() as conn:
+                for ev in fetch_events(conn, last_event_id, sub.team_ids):
+                    if sub.queue.full():
+                        break
+                    sub.queue.put_nowait(ev)
+                    sub.seen_id = ev["id"]
+        with self._lock:
+            self._subs.add(sub)
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._last_id = None
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name="sse-relay", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+
+    def _run(self, app):
+        interval = app.config["SSE_POLL_INTERVAL"]
+        with app.app_context():
+            while True:
+                self._wake.wait(interval)
+                self._wake.clear()
+                with self._lock:
+                    subs = list(self._subs)
+                if not subs:
+                    self._last_id = None  # idle: re-baseline when someone connects
+                    continue
+                try:
+                    self._poll(app, subs)
+                except Exception:
+                    app.logger.exception("SSE relay poll failed")
+
+    def _poll(self, app, subs):
+        with db.engine.connect() as conn:
+            if self._last_id is None:
+                self._last_id = conn.execute(
+                    select(func.coalesce(func.max(EntryEvent.id), 0))
+                ).scalar()
+                return
+            events = fetch_events(conn, self._last_id)
+            if events:
+                self._last_id = events[-1]["id"]
+            self._prune(app, conn)
+        for ev in events:
+            for sub in subs:
+                if ev["id"] > sub.seen_id and ev["teams"] & sub.team_ids:
+                    try:
+                        sub.queue.put_nowait(ev)
+                    except queue.Full:
+                        pass  # slow client; it resyncs via Last-Event-ID on reconnect
+
+    def _prune(self, app, conn):
+        now = datetime.utcnow().timestamp()
+        if now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+        cutoff = datetime.utcnow() - timedelta(hours=app.config["SSE_EVENT_RETENTION_HOURS"])
+        conn.execute(delete(EntryEvent).where(EntryEvent.created_at < cutoff))
+        conn.commit()
+
+
+broker = Broker()
+
+
+def stream(sub, keepalive):
+    """SSE body for one subscriber; ends when the client goes away."""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                ev = sub.queue.get(timeout=keepalive)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            payload = dict(ev, teams=sorted(ev["teams"] & sub.team_ids))
+            yield f"id: {ev['id']}\nevent: {ev['kind']}\ndata: {json.dumps(payload)}\n\n"
+    finally:
+        broker.unsubscribe(sub)
@@ -0,0 +1,10 @@
+# extensions.py
+# Extension singletons, bound to an app later by create_app() via init_app().
+# Flask-Migrate is not here: it pulls in alembic and is only needed by
+# `flask db`, see app._init_migrate().
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+login_manager = LoginManager()
+login_manager.login_view = "auth.login"
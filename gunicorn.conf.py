@@ -0,0 +1,25 @@
+# gunicorn.conf.py
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+# Threaded workers: an idle SSE connection (/entries/pending/stream) parks
+# one thread on a queue instead of occupying a whole sync worker.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "100"))
+
+# Import the app once in the master; workers share the loaded code
+# copy-on-write. app._dispose_engines_after_fork() drops any inherited
+# database pool in each worker, so no connection crosses the fork.
+preload_app = True
+wsgi_app = "wsgi:app"
+
+
+def post_worker_init(worker):
+    # start the live-timer sync (checkpoints, stale recovery) without waiting
+    # for this worker's first request
+    from timers import registry
+
+    registry.ensure(worker.wsgi)
@@ -0,0 +1,111 @@
+# invalidation.py
+# Per-process caches built from database tables, dropped when a commit in
+# this process writes one of those tables.
+#
+# One set of session hooks records the tables each transaction writes:
+# flushed objects (plus the association tables behind changed many-to-many
+# collections) and bulk insert()/update()/delete() statements, which bypass
+# the flush. After commit, every callback watching one of them runs. Writes
+# made by other processes are not seen here; caches bound that with a TTL.
+import threading
+import time
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+_WRITTEN = "tables_written"
+_watchers = []  # (frozenset of table names, callback)
+
+
+def _table_name(target):
+    if isinstance(target, str):
+        return target
+    return getattr(target, "__tablename__", None) or target.name
+
+
+def watch(targets, callback):
+    """Call `callback()` after each local commit that wrote one of `targets`.
+
+    Targets are models, Table objects or table names.
+    """
+    _watchers.append((frozenset(_table_name(t) for t in targets), callback))
+
+
+class Cached:
+    """Lazily loaded value, dropped on invalidate() and after `ttl` seconds.
+
+    A load that overlaps an invalidate() is returned to its caller but not
+    kept, so a commit landing mid-load is never hidden behind a stale value.
+    """
+
+    def __init__(self, loader, ttl=None):
+        self._loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._expires = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._value is not None and (
+                self._expires is None or self._expires > time.monotonic()
+            ):
+                return self._value
+            generation = self._generation
+        value = self._loader()
+        with self._lock:
+            if generation == self._generation:
+                self._value = value
+                self._expires = time.monotonic() + self.ttl if self.ttl else None
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._value = None
+
+
+def _written(session):
+    return session.info.setdefault(_WRITTEN, set())
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flush(session, flush_context, instances):
+    written = _written(session)
+    deleted = session.deleted
+    for obj in chain(session.new, session.dirty, deleted):
+        state = inspect(obj)
+        written.update(t.name for t in state.mapper.tables)
+        for rel in state.mapper.relationships:
+            if rel.secondary is None:
+                continue
+            # history is read without loading; deletes clear the link rows
+            if obj in deleted or state.attrs[rel.key].history.has_changes():
+                written.add(rel.secondary.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statements(orm_execute_state):
+    # bulk insert()/update()/delete() statements bypass the flush
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None:
+        _written(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    written = session.info.pop(_WRITTEN, None)
+    if not written:
+        return
+    for names, callback in _watchers:
+        if names & written:
+            callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop(_WRITTEN, None)
@@ -0,0 +1,266 @@
+# invoices.py
+# Month-end billing statements, one per customer, fanned out across a process pool.
+#
+# The pool starts its workers from a forkserver, never by forking the caller:
+# a web worker has writer, SSE and timer threads whose locks a fork would copy.
+# One run per period at a time, claimed through a running.json file in the
+# period's directory.
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import DateTime, Integer, bindparam, create_engine, text
+from sqlalchemy.pool import NullPool
+
+TEMPLATE_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "templates")
+
+# approved + billable hours for one customer, ordered so rows stream grouped
+ENTRIES_SQL = text(
+    """
+    SELECT p.id AS project_id, p.name AS project_name,
+           a.id AS activity_id, a.name AS activity_name,
+           te.duration_hours AS hours
+    FROM timesheet_entries te
+    JOIN activities a ON a.id = te.activity_id
+    JOIN projects p ON p.id = te.project_id
+    WHERE p.customer_id = :customer_id
+      AND te.is_approved = :yes
+      AND te.is_billable = :yes
+      AND te.start_time >= :start
+      AND te.start_time < :end
+    ORDER BY p.name, p.id, a.name, a.id
+    """
+).bindparams(
+    bindparam("customer_id", type_=Integer),
+    bindparam("start", type_=DateTime),
+    bindparam("end", type_=DateTime),
+)
+
+
+def month_bounds(period):
+    """'YYYY-MM' -> (first day, first day of next month)."""
+    start = datetime.strptime(period, "%Y-%m")
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+def period_dir(out_dir, period):
+    return os.path.join(out_dir, period)
+
+
+def _marker_path(out_dir, customer_id):
+    return os.path.join(out_dir, f"customer_{customer_id}.json")
+
+
+def _running_path(out_dir, period):
+    return os.path.join(period_dir(out_dir, period), "running.json")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def claim_run(out_dir, period):
+    """Mark a run of `period` as started by this process; False if one is going.
+
+    A claim left by a process that died is taken over: its finished
+    customers are skipped by the new run anyway.
+    """
+    os.makedirs(period_dir(out_dir, period), exist_ok=True)
+    path = _running_path(out_dir, period)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            status = run_status(out_dir, period)
+            if status is not None:
+                return False
+            continue  # stale claim removed, try again
+        started = datetime.now().isoformat(" ", "seconds")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"pid": os.getpid(), "started": started}, fh)
+        return True
+    return False
+
+
+def release_run(out_dir, period):
+    try:
+        os.remove(_running_path(out_dir, period))
+    except FileNotFoundError:
+        pass
+
+
+def run_status(out_dir, period):
+    """The claim of the run in progress for `period` ({"pid", "started"}), or None."""
+    path = _running_path(out_dir, period)
+    try:
+        with open(path, encoding="utf-8") as fh:
+            status = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        return {"pid": None, "started": None}  # being written right now
+    if status.get("pid") and not _alive(status["pid"]):
+        release_run(out_dir, period)
+        return None
+    return status
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w", newline="", encoding="utf-8") as fh:
+        write(fh)
+    os.replace(tmp, path)
+
+
+def build_statement(db_uri, customer_id, customer_name, period, out_dir, force=False):
+    """Worker: write CSV + HTML statement for one customer.
+
+    The JSON marker is written last, so a customer only counts as done once
+    both statements are on disk; re-runs skip done customers unless forced.
+    """
+    marker = _marker_path(out_dir, customer_id)
+    if not force and os.path.exists(marker):
+        with open(marker, encoding="utf-8") as fh:
+            result = json.load(fh)
+        result["status"] = "skipped"
+        return result
+
+    started = time.perf_counter()
+    start, end = month_bounds(period)
+    engine = create_engine(db_uri, poolclass=NullPool)
+    lines = []
+    try:
+        with engine.connect() as conn:
+            rows = conn.execution_options(stream_results=True, yield_per=1000).execute(
+                ENTRIES_SQL,
+                {"customer_id": customer_id, "yes": True, "start": start, "end": end},
+            )
+            current = None
+            for r in rows:
+                key = (r.project_id, r.activity_id)
+                if current is None or current["key"] != key:
+                    current = {
+                        "key": key,
+                        "project": r.project_name,
+                        "activity": r.activity_name,
+                        "entries": 0,
+                        "hours": 0.0,
+                    }
+                    lines.append(current)
+                current["entries"] += 1
+                current["hours"] += r.hours or 0.0
+    finally:
+        engine.dispose()
+
+    for line in lines:
+        line.pop("key")
+        line["hours"] = round(line["hours"], 2)
+    total = round(sum(line["hours"] for line in lines), 2)
+
+    base = os.path.join(out_dir, f"customer_{customer_id}")
+
+    def write_csv(fh):
+        w = csv.writer(fh)
+        w.writerow(["customer", "period", "project", "activity", "entries", "hours"])
+        for line in lines:
+            w.writerow(
+                [customer_name, period, line["project"], line["activity"],
+                 line["entries"], f"{line['hours']:.2f}"]
+            )
+        count = sum(line["entries"] for line in lines)
+        w.writerow([customer_name, period, "TOTAL", "", count, f"{total:.2f}"])
+
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(["html"])
+    )
+    html = env.get_template("invoice_statement.html").render(
+        customer=customer_name, period=period, lines=lines, total=total
+    )
+
+    _atomic_write(f"{base}.csv", write_csv)
+    _atomic_write(f"{base}.html", lambda fh: fh.write(html))
+
+    result = {
+        "customer_id": customer_id,
+        "customer": customer_name,
+        "period": period,
+        "lines": len(lines),
+        "hours": total,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    _atomic_write(marker, lambda fh: json.dump(result, fh, indent=2))
+    result["status"] = "written"
+    return result
+
+
+def run_invoices(db_uri, customers, period, out_dir, workers=None, force=False):
+    """Generate statements for `customers` [(id, name), ...] and write summary.json.
+
+    Each customer is independent, so a crashed run can simply be started
+    again: finished customers are skipped and only the rest are rebuilt.
+    """
+    month_bounds(period)  # validate before spawning anything
+    target = period_dir(out_dir, period)
+    os.makedirs(target, exist_ok=True)
+
+    started = time.perf_counter()
+    results, failures = [], []
+    ctx = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {
+            pool.submit(build_statement, db_uri, cid, name, period, target, force): (cid, name)
+            for cid, name in customers
+        }
+        for fut in as_completed(futures):
+            cid, name = futures[fut]
+            try:
+                results.append(fut.result())
+            except Exception as exc:  # keep going, report per customer
+                failures.append({"customer_id": cid, "customer": name, "error": str(exc)})
+
+    # a partial run (--customer) updates its customers in the period's
+    # summary and keeps everyone else's results
+    ran = {cid for cid, _ in customers}
+    previous = load_summary(out_dir, period) or {}
+    results += [r for r in previous.get("results", []) if r["customer_id"] not in ran]
+    failures += [f for f in previous.get("failures", []) if f["customer_id"] not in ran]
+    results.sort(key=lambda r: r["customer"])
+    failures.sort(key=lambda f: f["customer"])
+    summary = {
+        "period": period,
+        "customers": len(results) + len(failures),
+        "written": sum(1 for r in results if r["status"] == "written"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": len(failures),
+        "hours": round(sum(r["hours"] for r in results), 2),
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+        "failures": failures,
+    }
+    _atomic_write(
+        os.path.join(target, "summary.json"), lambda fh: json.dump(summary, fh, indent=2)
+    )
+    return summary
+
+
+def load_summary(out_dir, period):
+    path = os.path.join(period_dir(out_dir, period), "summary.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
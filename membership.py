@@ -0,0 +1,120 @@
+# membership.py
+# Team membership at scale: paginated, searchable member/candidate lists,
+# bulk add/remove as plain statements on team_members, and cached member
+# counts for the teams list.
+#
+# Candidates come from an anti-join (LEFT JOIN team_members ... IS NULL)
+# instead of a correlated EXISTS per user, and only one page of them is
+# ever loaded.
+from sqlalchemy import and_, delete, func, insert, select
+
+import invalidation
+from extensions import db
+from models import Team, User, team_members
+
+
+class Page:
+    __slots__ = ("items", "page", "per_page", "has_next", "query")
+
+    def __init__(self, items, page, per_page, has_next, query):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_next = has_next
+        self.query = query
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+
+def _page(stmt, query, page, per_page):
+    if query:
+        stmt = stmt.where(User.username.icontains(query, autoescape=True))
+    page = max(page, 1)
+    rows = db.session.execute(
+        stmt.order_by(User.username).limit(per_page + 1).offset((page - 1) * per_page)
+    ).all()
+    return Page(rows[:per_page], page, per_page, len(rows) > per_page, query)
+
+
+def members(team_id, query="", page=1, per_page=50):
+    """One page of (id, username) for the team's members."""
+    stmt = (
+        select(User.id, User.username)
+        .join(team_members, team_members.c.user_id == User.id)
+        .where(team_members.c.team_id == team_id)
+    )
+    return _page(stmt, query, page, per_page)
+
+
+def candidates(team_id, query="", page=1, per_page=50):
+    """One page of (id, username): approved ROLE_USERs not on the team."""
+    stmt = (
+        select(User.id, User.username)
+        .outerjoin(
+            team_members,
+            and_(team_members.c.user_id == User.id, team_members.c.team_id == team_id),
+        )
+        .where(
+            team_members.c.user_id.is_(None),
+            User.is_approved.is_(True),
+            User.role == "ROLE_USER",
+        )
+    )
+    return _page(stmt, query, page, per_page)
+
+
+# ----------------------------------------
+# Bulk writes (run through writer.run: fn(session, ...))
+# ----------------------------------------
+def add_members(session, team_id, user_ids):
+    """Insert memberships for existing users not yet on the team; None if no such team."""
+    if session.get(Team, team_id) is None:
+        return None
+    ids = set(user_ids)
+    if not ids:
+        return 0
+    known = set(session.scalars(select(User.id).where(User.id.in_(ids))))
+    present = set(
+        session.scalars(
+            select(team_members.c.user_id).where(
+                team_members.c.team_id == team_id, team_members.c.user_id.in_(known)
+            )
+        )
+    )
+    new = sorted(known - present)
+    if new:
+        session.execute(insert(team_members), [{"team_id": team_id, "user_id": u} for u in new])
+    return len(new)
+
+
+def remove_members(session, team_id, user_ids):
+    """Delete the given memberships in one statement; None if no such team."""
+    if session.get(Team, team_id) is None:
+        return None
+    ids = set(user_ids)
+    if not ids:
+        return 0
+    return session.execute(
+        delete(team_members).where(
+            team_members.c.team_id == team_id, team_members.c.user_id.in_(ids)
+        )
+    ).rowcount
+
+
+# ----------------------------------------
+# Member counts for the teams list
+# ----------------------------------------
+def _load_counts():
+    """{team_id: members} from one GROUP BY."""
+    return dict(
+        db.session.execute(
+            select(team_members.c.team_id, func.count()).group_by(team_members.c.team_id)
+        ).all()
+    )
+
+
+# dropped on local commits; the TTL (TEAM_COUNTS_TTL) covers other processes
+counts = invalidation.Cached(_load_counts)
+invalidation.watch([Team, team_members], counts.invalidate)
@@ -19,7 +19,15 @@ config = context.config
 fileConfig(config.config_file_name)
 
 # Import your Flask app and its extensions
-from app import app, db  # now db is the SQLAlchemy() instance
+from flask import current_app, has_app_context
+from extensions import db  # the SQLAlchemy() instance bound by create_app()
+
+if has_app_context():  # `flask db ...` already pushed one
+    app = current_app
+else:
+    from app import create_app
+
+    app = create_app()
 
 # Set the SQLAlchemy URL from your Flask config
 config.set_main_option("sqlalchemy.url", app.config["SQLALCHEMY_DATABASE_URI"])
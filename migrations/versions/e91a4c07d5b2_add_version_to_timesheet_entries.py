@@ -0,0 +1,26 @@
+"""Add version to timesheet_entries
+
+Revision ID: e91a4c07d5b2
+Revises: b3f80e41c6d7
+Create Date: 2026-10-19 11:48:37.120554
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91a4c07d5b2'
+down_revision = 'b3f80e41c6d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('timesheet_entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('timesheet_entries', schema=None) as batch_op:
+        batch_op.drop_column('version')
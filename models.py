@@ -1,7 +1,9 @@
 # models.py
+from datetime import datetime
+
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-from app import db  # noqa: E402
+from extensions import db, login_manager
 
 # association table for users ↔ teams
 team_members = db.Table(
@@ -37,6 +39,12 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
 
+# Flask-Login user loader
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
+
 class Customer(db.Model):
     __tablename__ = "customers"
     id = db.Column(db.Integer, primary_key=True)
@@ -67,6 +75,12 @@ class Activity(db.Model):
 
 class TimesheetEntry(db.Model):
     __tablename__ = "timesheet_entries"
+    # per-user, time-ordered lookups (own entries, recent usage, weekly grid)
+    __table_args__ = (
+        db.Index("ix_timesheet_entries_user_id_start_time", "user_id", "start_time"),
+        # live timers: the few running/paused rows among all the stopped ones
+        db.Index("ix_timesheet_entries_state", "state"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False)
@@ -79,6 +93,8 @@ class TimesheetEntry(db.Model):
     description = db.Column(db.Text, nullable=True)
     state = db.Column(db.String(20), default="stopped")
     tags = db.Column(db.String(255), nullable=True)
+    # optimistic concurrency: every UPDATE checks and bumps it
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     # newly added approval flag
     is_approved = db.Column(db.Boolean, nullable=False, default=False)
@@ -87,6 +103,8 @@ class TimesheetEntry(db.Model):
     project = db.relationship("Project", backref=db.backref("entries", lazy=True))
     activity = db.relationship("Activity", backref=db.backref("entries", lazy=True))
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Team(db.Model):
     __tablename__ = "teams"
@@ -101,3 +119,13 @@ class Team(db.Model):
 
     # members of this team
     members = db.relationship("User", secondary=team_members, back_populates="teams")
+
+
+# append-only feed of entry changes, relayed to SSE clients by events.py
+class EntryEvent(db.Model):
+    __tablename__ = "entry_events"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # "created" | "approved" | "deleted"
+    entry_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,168 @@
+# provisioning.py
+# Bulk user provisioning from CSV/JSON: validate every row up front, hash
+# passwords across a process pool, then insert users and team memberships
+# in one transaction.
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User, Team, team_members
+
+ROLES = ("ROLE_USER", "ROLE_TEAMLEAD", "ROLE_ADMIN")
+
+# below this many passwords a pool costs more to start than it saves
+POOL_THRESHOLD = 8
+
+
+class ProvisioningError(ValueError):
+    """The upload itself could not be read (bad format, missing columns)."""
+
+
+def parse_upload(filename, data):
+    """CSV or JSON bytes -> list of row dicts (username, password, role, teams, approved)."""
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    if filename.lower().endswith(".json"):
+        try:
+            rows = json.loads(text)
+        except ValueError as exc:
+            raise ProvisioningError(f"Invalid JSON: {exc}")
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ProvisioningError("JSON must be a list of objects.")
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or "username" not in reader.fieldnames:
+            raise ProvisioningError("CSV needs a header row with at least 'username'.")
+        rows = list(reader)
+    if not rows:
+        raise ProvisioningError("The file has no user rows.")
+    return [_normalize(r) for r in rows]
+
+
+def _normalize(raw):
+    teams = raw.get("teams") or []
+    if isinstance(teams, str):
+        teams = [t.strip() for t in teams.replace(",", ";").split(";")]
+    elif not isinstance(teams, list) or not all(isinstance(t, str) for t in teams):
+        raise ProvisioningError(
+            f"'teams' for {raw.get('username')!r} must be a string or a list of strings."
+        )
+    # optional: a missing or blank cell means approved
+    approved = raw.get("approved")
+    if approved is None or (isinstance(approved, str) and not approved.strip()):
+        approved = True
+    elif isinstance(approved, str):
+        approved = approved.strip().lower() not in ("0", "false", "no", "n")
+    return {
+        "username": str(raw.get("username") or "").strip(),
+        "password": str(raw.get("password") or ""),
+        "role": str(raw.get("role") or "ROLE_USER").strip().upper(),
+        "teams": [t for t in teams if t],
+        "approved": bool(approved),
+    }
+
+
+def hash_passwords(passwords, workers=None):
+    """generate_password_hash() for each password, fanned out over processes."""
+    if len(passwords) < POOL_THRESHOLD:
+        return [generate_password_hash(p) for p in passwords]
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(passwords) // (workers * 4))
+    # forkserver: never fork the threaded web worker (writer, SSE, timer threads)
+    ctx = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(generate_password_hash, passwords, chunksize=chunk))
+
+
+def provision(rows, dry_run=False, workers=None):
+    """Create users + memberships for `rows`; returns a per-row report.
+
+    Either every valid row is written in one transaction or, if any row has
+    an error, nothing is written: fix the file and upload it again.
+    """
+    report = [
+        {"row": i, "username": r["username"], "role": r["role"], "teams": r["teams"],
+         "status": "ok", "message": ""}
+        for i, r in enumerate(rows, start=1)
+    ]
+
+    def fail(i, message):
+        report[i]["status"] = "error"
+        report[i]["message"] = message
+
+    seen = set()
+    for i, r in enumerate(rows):
+        if not r["username"]:
+            fail(i, "Missing username.")
+        elif r["username"] in seen:
+            fail(i, "Duplicate username in file.")
+        elif not r["password"]:
+            fail(i, "Missing password.")
+        elif r["role"] not in ROLES:
+            fail(i, f"Unknown role '{r['role']}'.")
+        seen.add(r["username"])
+
+    # one query each for existing usernames and referenced teams
+    names = [r["username"] for r in rows if r["username"]]
+    taken = {
+        u for (u,) in db.session.query(User.username).filter(User.username.in_(names))
+    } if names else set()
+    wanted = {t for r in rows for t in r["teams"]}
+    team_ids = dict(
+        db.session.query(Team.name, Team.id).filter(Team.name.in_(wanted))
+    ) if wanted else {}
+
+    for i, r in enumerate(rows):
+        if report[i]["status"] != "ok":
+            continue
+        if r["username"] in taken:
+            fail(i, "Username already exists.")
+            continue
+        missing = [t for t in r["teams"] if t not in team_ids]
+        if missing:
+            fail(i, f"Unknown team(s): {', '.join(missing)}.")
+
+    errors = sum(1 for line in report if line["status"] == "error")
+    valid = [i for i, line in enumerate(report) if line["status"] == "ok"]
+
+    if dry_run or errors or not valid:
+        for i in valid:
+            report[i]["status"] = "would_create" if dry_run else "not_created"
+        return {"dry_run": dry_run, "created": 0, "errors": errors, "rows": report}
+
+    hashes = hash_passwords([rows[i]["password"] for i in valid], workers=workers)
+    try:
+        created = db.session.execute(
+            insert(User).returning(User.id, User.username),
+            [
+                {
+                    "username": rows[i]["username"],
+                    "password_hash": h,
+                    "role": rows[i]["role"],
+                    "is_approved": rows[i]["approved"],
+                }
+                for i, h in zip(valid, hashes)
+            ],
+        ).all()
+        user_ids = {name: uid for uid, name in created}
+        memberships = [
+            {"team_id": team_ids[t], "user_id": user_ids[rows[i]["username"]]}
+            for i in valid
+            for t in dict.fromkeys(rows[i]["teams"])
+        ]
+        if memberships:
+            db.session.execute(insert(team_members), memberships)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for i in valid:
+        report[i]["status"] = "created"
+    return {"dry_run": False, "created": len(valid), "errors": 0, "rows": report}
@@ -0,0 +1,159 @@
+# search.py
+# Typeahead over the activity catalog for the entry form.
+#
+# A per-process prefix index (sorted token list + bisect) over activity,
+# project and customer names, rebuilt after any local commit that touches the
+# catalog and at least every TYPEAHEAD_INDEX_TTL seconds, so catalog changes
+# made by other worker processes show up too. Matches are ranked by the user's own recent usage, then by
+# whether their teammates work on the project; nothing active is hidden.
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+import invalidation
+from extensions import db
+from models import Activity, Project, Customer, TimesheetEntry, team_members
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+_CATALOG = (Activity, Project, Customer)
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+class CatalogIndex:
+    """Immutable prefix index over active activities."""
+
+    def __init__(self, rows):
+        self.items = {}
+        pairs = []
+        for aid, activity, pid, project, customer in rows:
+            self.items[aid] = {
+                "id": aid,
+                "activity": activity,
+                "project_id": pid,
+                "project": project,
+                "customer": customer,
+            }
+            for token in set(tokenize(f"{activity} {project} {customer}")):
+                pairs.append((token, aid))
+        pairs.sort()
+        self._keys = [t for t, _ in pairs]
+        self._ids = [a for _, a in pairs]
+
+    def _prefix(self, prefix):
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        return set(self._ids[lo:hi])
+
+    def search(self, query):
+        """Activity ids where every query word prefixes some name word."""
+        result = None
+        for token in tokenize(query):
+            ids = self._prefix(token)
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result if result is not None else set(self.items)
+
+
+def _load_index():
+    rows = (
+        db.session.query(Activity.id, Activity.name, Project.id, Project.name, Customer.name)
+        .join(Project, Project.id == Activity.project_id)
+        .join(Customer, Customer.id == Project.customer_id)
+        .filter(
+            Activity.is_active.isnot(False),
+            Project.is_active.isnot(False),
+            Customer.is_active.isnot(False),
+        )
+        .all()
+    )
+    return CatalogIndex(rows)
+
+
+# the TTL (TYPEAHEAD_INDEX_TTL) covers catalog commits from other processes
+index = invalidation.Cached(_load_index)
+invalidation.watch(_CATALOG, index.invalidate)
+
+
+# ----------------------------------------
+# Per-user scope and ranking
+# ----------------------------------------
+_team_projects = {}  # user_id -> (expires_at, frozenset of project ids)
+_team_projects_lock = threading.Lock()
+
+
+def team_project_ids(user_id, since, ttl):
+    """Projects anyone on the user's teams logged time to since `since`.
+
+    Only a ranking hint: usage can't tell which projects a team is about to
+    start on, so it must never decide what can be found.
+    """
+    now = time.monotonic()
+    hit = _team_projects.get(user_id)
+    if hit and hit[0] > now:
+        return hit[1]
+    mine = db.session.query(team_members.c.team_id).filter(team_members.c.user_id == user_id)
+    mates = db.session.query(team_members.c.user_id).filter(team_members.c.team_id.in_(mine))
+    ids = {
+        pid
+        for (pid,) in db.session.query(TimesheetEntry.project_id)
+        .filter(TimesheetEntry.user_id.in_(mates), TimesheetEntry.start_time >= since)
+        .distinct()
+    }
+    value = frozenset(ids)
+    with _team_projects_lock:
+        if len(_team_projects) > 10000:
+            _team_projects.clear()
+        _team_projects[user_id] = (now + ttl, value)
+    return value
+
+
+def recent_usage(user_id, since):
+    """{activity_id: (entries, last start)} for the user's own entries since `since`."""
+    rows = (
+        db.session.query(
+            TimesheetEntry.activity_id,
+            func.count(TimesheetEntry.id),
+            func.max(TimesheetEntry.start_time),
+        )
+        .filter(TimesheetEntry.user_id == user_id, TimesheetEntry.start_time >= since)
+        .group_by(TimesheetEntry.activity_id)
+        .all()
+    )
+    return {aid: (n, last) for aid, n, last in rows}
+
+
+def suggest(user_id, query, limit, recent_days=90, scope_ttl=300):
+    """Top `limit` activities for `query`; empty query -> the user's recent picks."""
+    idx = index.get()
+    since = datetime.now() - timedelta(days=recent_days)
+    usage = recent_usage(user_id, since)
+    if query.strip():
+        candidates = idx.search(query)
+    else:
+        candidates = set(usage) & set(idx.items)
+    team = team_project_ids(user_id, since, scope_ttl)
+
+    def rank(aid):
+        n, last = usage.get(aid, (0, None))
+        item = idx.items[aid]
+        return (
+            -n,
+            item["project_id"] not in team,
+            -(last.timestamp() if last else 0),
+            item["project"],
+            item["activity"],
+        )
+
+    return [
+        dict(idx.items[aid], uses=usage.get(aid, (0, None))[0])
+        for aid in heapq.nsmallest(limit, candidates, key=rank)
+    ]
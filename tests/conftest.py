@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app  # noqa: E402
+from config import TestConfig  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Activity, Customer, Project, User  # noqa: E402
+
+
+def _make_app(tmp_path, **overrides):
+    # a file database: the writer thread and the test need the same one
+    config = type("Config", (TestConfig,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.sqlite'}",
+        **overrides,
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        customer = Customer(name="Acme")
+        project = Project(name="Website", customer=customer)
+        db.session.add_all([
+            User(username="alice", password_hash="x", role="ROLE_USER", is_approved=True),
+            Activity(name="Design", project=project),
+        ])
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = _make_app(tmp_path)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def coalescing_app(tmp_path):
+    # a wide window so every job a test submits lands in one batch
+    app = _make_app(tmp_path, WRITE_COALESCING=True, WRITE_QUEUE_WINDOW_MS=200)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
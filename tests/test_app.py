@@ -0,0 +1,63 @@
+import os
+
+import app as app_module
+from app import create_app
+from config import TestConfig
+from extensions import db
+
+BLUEPRINTS = {"auth", "catalog", "entries", "teams", "billing", "analytics"}
+
+
+def test_create_app_from_a_config_class():
+    app = create_app(TestConfig)
+    assert app.testing
+    assert app.config["SQLALCHEMY_DATABASE_URI"] == "sqlite://"
+    assert BLUEPRINTS <= set(app.blueprints)
+
+
+def test_create_app_from_a_mapping_of_overrides():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "TYPEAHEAD_LIMIT": 3})
+    assert app.config["TYPEAHEAD_LIMIT"] == 3
+    # everything else still comes from config.Config
+    assert app.config["TEAM_PICKER_PAGE_SIZE"] == 50
+    assert not app.testing
+
+
+def test_routes_are_reachable(app):
+    client = app.test_client()
+    assert client.get("/login").status_code == 200
+    # login_required views send anonymous users to the login page
+    assert client.get("/customers").status_code == 302
+
+
+def _pooled_engine(app):
+    engine = db.engine
+    with engine.connect():
+        pass
+    assert engine in app_module._engines
+    return engine
+
+
+def test_engines_are_disposed_after_fork(app):
+    engine = _pooled_engine(app)
+    parent_pool = engine.pool
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child: report whether it got a fresh pool, then leave at once
+        os.write(write, b"1" if engine.pool is not parent_pool else b"0")
+        os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b"1"
+    # the parent keeps its own pool and connections
+    assert engine.pool is parent_pool
+    assert parent_pool.checkedin() == 1
+
+
+def test_dispose_keeps_the_parents_connections_open(app):
+    engine = _pooled_engine(app)
+    old = engine.pool
+    app_module._dispose_engines_after_fork()
+    assert engine.pool is not old
+    # close=False: the inherited connection was dropped, not closed
+    assert old.checkedin() == 1
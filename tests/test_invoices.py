@@ -0,0 +1,64 @@
+import json
+import time
+
+import pytest
+from sqlalchemy import select
+
+import invoices
+from extensions import db
+from models import User
+
+
+@pytest.fixture
+def out_dir(app, tmp_path):
+    app.config["INVOICE_DIR"] = str(tmp_path / "invoices")
+    return app.config["INVOICE_DIR"]
+
+
+@pytest.fixture
+def admin(app):
+    db.session.add(User(username="root", password_hash="x", role="ROLE_ADMIN", is_approved=True))
+    db.session.commit()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(db.session.scalar(select(User.id).where(User.username == "root")))
+        session["_fresh"] = True
+    return client
+
+
+def test_one_run_per_period(out_dir):
+    assert invoices.claim_run(out_dir, "2025-05")
+    assert not invoices.claim_run(out_dir, "2025-05")
+    assert invoices.claim_run(out_dir, "2025-06")
+    invoices.release_run(out_dir, "2025-05")
+    assert invoices.run_status(out_dir, "2025-05") is None
+
+
+def test_claim_of_a_dead_process_is_taken_over(out_dir):
+    invoices.claim_run(out_dir, "2025-05")
+    path = invoices._running_path(out_dir, "2025-05")
+    with open(path, "w") as fh:
+        json.dump({"pid": 2**22 + 1, "started": "2025-06-01 00:00:00"}, fh)
+    assert invoices.claim_run(out_dir, "2025-05")
+
+
+def test_run_from_the_page_is_backgrounded(admin, out_dir):
+    r = admin.post("/invoices/run", data={"period": "2025-05"})
+    assert r.status_code == 302
+    assert "period=2025-05" in r.headers["Location"]
+
+    deadline = time.monotonic() + 60
+    while invoices.run_status(out_dir, "2025-05") is not None:
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+    summary = invoices.load_summary(out_dir, "2025-05")
+    assert (summary["customers"], summary["written"], summary["failed"]) == (1, 1, 0)
+    assert b"Acme" in admin.get("/invoices?period=2025-05").data
+
+
+def test_second_run_while_one_is_going(admin, out_dir):
+    invoices.claim_run(out_dir, "2025-05")
+    assert admin.post("/invoices/run", data={"period": "2025-05"}).status_code == 302
+    with admin.session_transaction() as session:
+        assert session["_flashes"][-1][0] == "warning"
+    assert b"in progress" in admin.get("/invoices?period=2025-05").data
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import select
+from werkzeug.security import check_password_hash
+
+import provisioning
+from extensions import db
+from models import User
+
+
+@pytest.mark.parametrize("filename, data", [
+    ("users.csv", b"username,password,role,teams,approved\n"),
+    ("users.json", b"[]"),
+])
+def test_upload_without_rows_is_rejected(filename, data):
+    with pytest.raises(provisioning.ProvisioningError):
+        provisioning.parse_upload(filename, data)
+
+
+def test_blank_approved_means_yes():
+    rows = provisioning.parse_upload(
+        "users.csv", b"username,password,role,teams,approved\nbob,pw,,,\ncarol,pw,,,no\n"
+    )
+    assert [r["approved"] for r in rows] == [True, False]
+
+
+@pytest.mark.parametrize("teams", ["5", '["a", 1]', '{"a": 1}'])
+def test_malformed_teams_are_rejected(teams):
+    with pytest.raises(provisioning.ProvisioningError):
+        provisioning.parse_upload("users.json", f'[{{"username": "bob", "teams": {teams}}}]')
+
+
+def test_provision_creates_users(app):
+    rows = provisioning.parse_upload("users.csv", b"username,password\nbob,pw\ncarol,pw\n")
+    result = provisioning.provision(rows)
+    assert (result["created"], result["errors"]) == (2, 0)
+    assert {"bob", "carol"} <= set(db.session.scalars(select(User.username)))
+
+
+def test_provision_with_nothing_valid_writes_nothing(app):
+    assert provisioning.provision([])["created"] == 0
+
+
+def test_hash_passwords_in_a_process_pool():
+    passwords = [f"pw{i}" for i in range(provisioning.POOL_THRESHOLD)]
+    hashes = provisioning.hash_passwords(passwords, workers=2)
+    assert all(check_password_hash(h, p) for h, p in zip(hashes, passwords))
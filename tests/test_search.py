@@ -0,0 +1,38 @@
+import time
+
+from sqlalchemy import insert, select
+
+import search
+from extensions import db
+from models import Activity, Project
+
+
+def _other_process_adds(name):
+    # a plain connection: no Session, so no local invalidation either
+    project_id = db.session.scalar(select(Project.id))
+    with db.engine.begin() as conn:
+        conn.execute(insert(Activity), [{"name": name, "project_id": project_id}])
+
+
+def _found(query):
+    return [r["activity"] for r in search.index.get().items.values() if r["activity"] == query]
+
+
+def test_local_commit_rebuilds_the_index(app):
+    search.index.ttl = 3600
+    search.index.invalidate()
+    assert _found("Review") == []
+    db.session.add(Activity(name="Review", project_id=db.session.scalar(select(Project.id))))
+    db.session.commit()
+    assert _found("Review") == ["Review"]
+
+
+def test_ttl_bounds_changes_from_other_processes(app):
+    search.index.ttl = 0.2
+    search.index.invalidate()
+    search.index.get()
+    _other_process_adds("Audit")
+    assert _found("Audit") == []
+
+    time.sleep(0.3)
+    assert _found("Audit") == ["Audit"]
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+import timers
+import weekly
+import writer
+from extensions import db
+from models import Activity, TimesheetEntry, User
+
+T0 = datetime(2025, 5, 5, 9, 0)
+
+
+@pytest.fixture
+def user_id(app):
+    return db.session.scalar(select(User.id).where(User.username == "alice"))
+
+
+@pytest.fixture
+def activity_id(app):
+    return db.session.scalar(select(Activity.id))
+
+
+def _entry(entry_id):
+    db.session.rollback()
+    return db.session.get(TimesheetEntry, entry_id)
+
+
+def test_pause_resume_stop_keeps_span_equal_to_duration(user_id, activity_id):
+    eid = writer.run(timers.start, user_id, activity_id, T0)
+    writer.run(timers.pause, user_id, T0 + timedelta(minutes=30))
+    writer.run(timers.resume, user_id, T0 + timedelta(hours=5))
+    writer.run(timers.stop, user_id, T0 + timedelta(hours=5, minutes=30))
+
+    e = _entry(eid)
+    assert e.state == timers.STOPPED
+    assert e.duration_hours == pytest.approx(1.0)
+    assert e.start_time == T0
+    assert e.end_time == T0 + timedelta(hours=1)
+
+
+def test_transitions_from_the_wrong_state(user_id, activity_id):
+    with pytest.raises(timers.TimerError):
+        writer.run(timers.pause, user_id, T0)
+    writer.run(timers.start, user_id, activity_id, T0)
+    with pytest.raises(timers.TimerError):
+        writer.run(timers.resume, user_id, T0 + timedelta(minutes=1))
+
+
+def test_starting_a_timer_stops_the_active_one(user_id, activity_id):
+    first = writer.run(timers.start, user_id, activity_id, T0)
+    second = writer.run(timers.start, user_id, activity_id, T0 + timedelta(minutes=45))
+
+    assert _entry(first).state == timers.STOPPED
+    assert _entry(first).end_time == T0 + timedelta(minutes=45)
+    assert _entry(second).state == timers.RUNNING
+
+
+def test_stale_version_is_a_conflict(user_id, activity_id):
+    writer.run(timers.start, user_id, activity_id, T0)
+    row = timers._active(db.session, user_id)
+    writer.run(timers.pause, user_id, T0 + timedelta(minutes=10))
+    with pytest.raises(timers.TimerConflict):
+        writer.run(timers._transition, row, state=timers.STOPPED)
+
+
+def test_week_grid_locks_a_live_timer(user_id, activity_id):
+    eid = writer.run(timers.start, user_id, activity_id, T0)
+    monday = weekly.week_start(date(2025, 5, 5))
+    cell = weekly.load_week(user_id, monday)["cells"][(activity_id, 0)]
+    assert cell["locked"]
+
+    change = {"activity_id": activity_id, "day": 0, "hours": 0,
+              "entry_id": eid, "version": cell["version"]}
+    with pytest.raises(weekly.WeekError):
+        weekly.save_week(user_id, monday, [change])
+    assert _entry(eid).state == timers.RUNNING
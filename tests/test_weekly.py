@@ -0,0 +1,107 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+import weekly
+from extensions import db
+from models import Activity, EntryEvent, TimesheetEntry, User
+
+MONDAY = date(2025, 5, 5)
+
+
+@pytest.fixture
+def user_id(app):
+    return db.session.scalar(select(User.id).where(User.username == "alice"))
+
+
+@pytest.fixture
+def activity_id(app):
+    return db.session.scalar(select(Activity.id))
+
+
+@pytest.fixture
+def client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    return client
+
+
+def _cell(user_id, activity_id, day=0):
+    db.session.rollback()
+    return weekly.load_week(user_id, MONDAY)["cells"].get((activity_id, day))
+
+
+def _change(activity_id, hours, cell=None, day=0):
+    return {
+        "activity_id": activity_id, "day": day, "hours": hours,
+        "entry_id": cell and cell["entry_id"], "version": cell and cell["version"],
+    }
+
+
+def _kinds():
+    return [e.kind for e in db.session.scalars(select(EntryEvent).order_by(EntryEvent.id))]
+
+
+def test_insert_update_delete(user_id, activity_id):
+    counts = weekly.save_week(user_id, MONDAY, [_change(activity_id, 2)])
+    assert counts == {"inserted": 1, "updated": 0, "deleted": 0}
+    cell = _cell(user_id, activity_id)
+    assert (cell["hours"], cell["version"]) == (2, 1)
+
+    weekly.save_week(user_id, MONDAY, [_change(activity_id, 3.5, cell)])
+    cell = _cell(user_id, activity_id)
+    assert (cell["hours"], cell["version"]) == (3.5, 2)
+    entry = db.session.get(TimesheetEntry, cell["entry_id"])
+    assert (entry.end_time - entry.start_time).total_seconds() == 3.5 * 3600
+
+    weekly.save_week(user_id, MONDAY, [_change(activity_id, 0, cell)])
+    assert _cell(user_id, activity_id) is None
+    assert _kinds() == ["created", "deleted"]
+
+
+def test_stale_version_rolls_back_the_whole_save(user_id, activity_id):
+    weekly.save_week(user_id, MONDAY, [_change(activity_id, 2)])
+    loaded = _cell(user_id, activity_id)
+    # another tab saves first
+    weekly.save_week(user_id, MONDAY, [_change(activity_id, 4, loaded)])
+
+    with pytest.raises(weekly.WeekConflict) as exc:
+        weekly.save_week(user_id, MONDAY, [
+            _change(activity_id, 1, loaded),
+            _change(activity_id, 8, day=1),
+        ])
+    assert exc.value.cells == [(activity_id, 0)]
+    assert _cell(user_id, activity_id)["hours"] == 4
+    assert _cell(user_id, activity_id, day=1) is None
+
+
+def test_approved_cells_are_read_only(user_id, activity_id):
+    weekly.save_week(user_id, MONDAY, [_change(activity_id, 2)])
+    cell = _cell(user_id, activity_id)
+    db.session.get(TimesheetEntry, cell["entry_id"]).is_approved = True
+    db.session.commit()
+
+    cell = _cell(user_id, activity_id)
+    assert cell["locked"]
+    with pytest.raises(weekly.WeekError):
+        weekly.save_week(user_id, MONDAY, [_change(activity_id, 0, cell)])
+
+
+def test_post_week(client, user_id, activity_id):
+    start = MONDAY.isoformat()
+    r = client.post("/entries/week", json={"start": start, "changes": [_change(activity_id, 2)]})
+    assert r.status_code == 200
+    assert r.get_json()["saved"]["inserted"] == 1
+
+    stale = {"start": start, "changes": [_change(activity_id, 5, {"entry_id": 1, "version": 9})]}
+    r = client.post("/entries/week", json=stale)
+    assert r.status_code == 409
+    assert r.get_json()["conflicts"] == [f"{activity_id}:0"]
+
+
+@pytest.mark.parametrize("body", [[1, 2], "week", None])
+def test_post_week_rejects_non_objects(client, body):
+    assert client.post("/entries/week", json=body).status_code == 400
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import event, func, insert, select
+
+import writer
+from extensions import db
+from models import Customer, Team, User
+
+
+@pytest.fixture
+def statements(coalescing_app):
+    """Every statement SQLite runs on the writer's connections."""
+    seen = []
+
+    def trace(dbapi_conn, record):
+        dbapi_conn.set_trace_callback(seen.append)
+
+    wq = coalescing_app.extensions["write_queue"]
+    wq._ensure_thread()
+    event.listen(wq.engine, "connect", trace)
+    wq.engine.dispose()
+    yield seen
+    event.remove(wq.engine, "connect", trace)
+
+
+def _add_team(session, name):
+    session.execute(insert(Team), [{"name": name}])
+    return name
+
+
+def _fail(session):
+    session.execute(insert(Team), [{"name": "doomed"}])
+    raise ValueError("nope")
+
+
+def _submit(coalescing_app, *jobs):
+    wq = coalescing_app.extensions["write_queue"]
+    return [wq.submit(fn, *args) for fn, *args in jobs]
+
+
+def _teams():
+    db.session.rollback()
+    return set(db.session.scalars(select(Team.name)))
+
+
+def test_batch_is_one_transaction(coalescing_app, statements):
+    futures = _submit(coalescing_app, *[(_add_team, f"t{i}") for i in range(5)])
+    assert [f.result(timeout=10) for f in futures] == [f"t{i}" for i in range(5)]
+
+    begins = [s for s in statements if s.startswith("BEGIN")]
+    assert begins == ["BEGIN IMMEDIATE"]
+    assert statements.count("COMMIT") == 1
+    assert sum(s.startswith("SAVEPOINT") for s in statements) == 5
+    assert _teams() == {f"t{i}" for i in range(5)}
+
+
+def test_failed_job_is_rolled_back_alone(coalescing_app):
+    ok, bad, also_ok = _submit(
+        coalescing_app, (_add_team, "a"), (_fail,), (_add_team, "b")
+    )
+    assert ok.result(timeout=10) == "a"
+    assert also_ok.result(timeout=10) == "b"
+    with pytest.raises(ValueError):
+        bad.result(timeout=10)
+    assert _teams() == {"a", "b"}
+
+
+def test_failed_commit_fails_the_whole_batch(coalescing_app):
+    def refuse(conn):
+        raise RuntimeError("disk full")
+
+    wq = coalescing_app.extensions["write_queue"]
+    wq._ensure_thread()
+    event.listen(wq.engine, "commit", refuse)
+    try:
+        futures = _submit(coalescing_app, (_add_team, "a"), (_add_team, "b"))
+        for f in futures:
+            with pytest.raises(RuntimeError):
+                f.result(timeout=10)
+    finally:
+        event.remove(wq.engine, "commit", refuse)
+    assert _teams() == set()
+
+
+def test_run_direct_commits(app):
+    assert writer.run(_add_team, "direct") == "direct"
+    db.session.rollback()
+    assert db.session.scalar(select(func.count()).select_from(Team)) == 1
+
+
+def test_direct_commit_after_a_batch(coalescing_app):
+    # a view that still commits on db.session, after the writer committed
+    # between its first read (the user load) and its own write
+    db.session.add(User(username="root", password_hash="x", role="ROLE_ADMIN", is_approved=True))
+    db.session.commit()
+    admin_id = db.session.scalar(select(User.id).where(User.username == "root"))
+
+    @coalescing_app.before_request
+    def _write_meanwhile():
+        from flask_login import current_user
+
+        current_user.role  # loads the user
+        _submit(coalescing_app, (_add_team, "meanwhile"))[0].result(timeout=10)
+
+    client = coalescing_app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(admin_id)
+        session["_fresh"] = True
+    r = client.post("/customers/new", data={"name": "Globex"})
+    assert r.status_code == 302
+    db.session.rollback()
+    assert "Globex" in db.session.scalars(select(Customer.name)).all()
+    assert "meanwhile" in _teams()
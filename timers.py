@@ -0,0 +1,310 @@
+# timers.py
+# Live timers on TimesheetEntry.state ("running" / "paused" / "stopped").
+#
+# A timer is an ordinary entry row. While it runs, duration_hours holds the
+# time folded in so far and end_time the moment it was last folded (start,
+# resume or checkpoint), so elapsed = duration_hours + (now - end_time) and a
+# dead process loses nothing. On stop the row becomes a plain entry again:
+# end_time = start_time + duration_hours, paused time left out. The row is written on start/pause/resume/stop
+# and at a coarse checkpoint that keeps reports roughly current, never per
+# tick; every write is guarded by TimesheetEntry.version.
+#
+# Each process keeps the active timers in a small registry, loaded through
+# the state index and refreshed every TIMER_SYNC_SECONDS and after its own
+# changes. "Running now" and a user's own timer are answered from it. A
+# running row that nobody checkpointed for TIMER_STALE_AFTER seconds (every
+# server was down) is paused at its last checkpoint rather than billing the
+# outage.
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, insert, select, update
+
+import events
+import writer
+from extensions import db
+from models import Activity, Project, TimesheetEntry, User
+
+RUNNING, PAUSED, STOPPED = "running", "paused", "stopped"
+ACTIVE = (RUNNING, PAUSED)
+
+entries_table = TimesheetEntry.__table__
+
+
+class TimerError(ValueError):
+    """The requested transition is not possible (no timer, wrong state)."""
+
+
+class TimerConflict(Exception):
+    """The timer row changed since it was read (another tab or process)."""
+
+
+def _hours(since, now):
+    return max((now - since).total_seconds(), 0) / 3600
+
+
+# ----------------------------------------
+# Transitions (run through writer.run: fn(session, ...))
+# ----------------------------------------
+def _active(session, user_id):
+    return session.execute(
+        select(
+            entries_table.c.id, entries_table.c.state, entries_table.c.start_time,
+            entries_table.c.end_time, entries_table.c.duration_hours, entries_table.c.version,
+        )
+        .where(entries_table.c.user_id == user_id, entries_table.c.state.in_(ACTIVE))
+        .order_by(entries_table.c.start_time.desc())
+    ).first()
+
+
+def _transition(session, row, **values):
+    matched = session.execute(
+        update(entries_table)
+        .where(entries_table.c.id == row.id, entries_table.c.version == row.version)
+        .values(version=entries_table.c.version + 1, **values)
+    ).rowcount
+    if matched != 1:
+        raise TimerConflict(f"timer {row.id} changed meanwhile")
+
+
+def _fold(row, now):
+    """Running time since the last write, folded into the row."""
+    if row.state != RUNNING:
+        return {}
+    return {"duration_hours": row.duration_hours + _hours(row.end_time, now), "end_time": now}
+
+
+def _stop(session, user_id, row, now):
+    hours = _fold(row, now).get("duration_hours", row.duration_hours)
+    # end where the worked time ends, as every other entry does
+    _transition(
+        session, row, state=STOPPED, duration_hours=hours,
+        end_time=row.start_time + timedelta(hours=hours),
+    )
+    # a stopped timer is a finished entry: announce it like a new one
+    events.record(session, [{"kind": "created", "entry_id": row.id, "user_id": user_id}])
+
+
+def start(session, user_id, activity_id, now, description=""):
+    """Start a timer on `activity_id`, stopping the user's active one; returns the entry id."""
+    activity = session.get(Activity, activity_id) if activity_id else None
+    if activity is None or activity.is_active is False:
+        raise TimerError("Pick an activity from the list.")
+    row = _active(session, user_id)
+    if row is not None:
+        _stop(session, user_id, row, now)
+    return session.execute(
+        insert(TimesheetEntry).returning(TimesheetEntry.id),
+        [{
+            "user_id": user_id,
+            "project_id": activity.project_id,
+            "activity_id": activity.id,
+            "start_time": now,
+            "end_time": now,
+            "duration_hours": 0.0,
+            "is_billable": activity.is_billable is not False,
+            "description": description,
+            "is_approved": False,
+            "state": RUNNING,
+            "version": 1,
+        }],
+    ).scalar_one()
+
+
+def resume(session, user_id, now):
+    row = _active(session, user_id)
+    if row is None or row.state != PAUSED:
+        raise TimerError("No paused timer to resume.")
+    _transition(session, row, state=RUNNING, end_time=now)
+    return row.id
+
+
+def pause(session, user_id, now):
+    row = _active(session, user_id)
+    if row is None or row.state != RUNNING:
+        raise TimerError("No running timer to pause.")
+    _transition(session, row, state=PAUSED, **_fold(row, now))
+    return row.id
+
+
+def stop(session, user_id, now):
+    row = _active(session, user_id)
+    if row is None:
+        raise TimerError("No timer to stop.")
+    _stop(session, user_id, row, now)
+    return row.id
+
+
+def _maintain(session, due, stale, now):
+    """Checkpoint `due` running timers and pause `stale` ones, one executemany each.
+
+    Rows another process already touched no longer match their version and
+    are skipped; the next sync picks up whatever it wrote.
+    """
+    guard = (
+        (entries_table.c.id == bindparam("b_id"))
+        & (entries_table.c.version == bindparam("b_version"))
+        & (entries_table.c.state == RUNNING)
+    )
+    if due:
+        session.execute(
+            update(entries_table).where(guard).values(
+                duration_hours=bindparam("b_hours"),
+                end_time=now,
+                version=entries_table.c.version + 1,
+            ),
+            [{"b_id": t.entry_id, "b_version": t.version, "b_hours": t.elapsed(now)} for t in due],
+        )
+    if stale:
+        # keep the hours up to the last checkpoint; the user resumes or edits
+        session.execute(
+            update(entries_table).where(guard).values(
+                state=PAUSED, version=entries_table.c.version + 1
+            ),
+            [{"b_id": t.entry_id, "b_version": t.version} for t in stale],
+        )
+
+
+# ----------------------------------------
+# Registry
+# ----------------------------------------
+class Timer:
+    __slots__ = ("entry_id", "user_id", "username", "project", "activity",
+                 "state", "hours", "since", "started", "version")
+
+    def __init__(self, entry_id, user_id, username, project, activity,
+                 state, hours, since, started, version):
+        self.entry_id = entry_id
+        self.user_id = user_id
+        self.username = username
+        self.project = project
+        self.activity = activity
+        self.state = state
+        self.hours = hours
+        self.since = since
+        self.started = started
+        self.version = version
+
+    def elapsed(self, now):
+        """Hours so far, including the unwritten part of a running segment."""
+        if self.state == RUNNING:
+            return self.hours + _hours(self.since, now)
+        return self.hours
+
+    def as_dict(self, now):
+        return {
+            "entry_id": self.entry_id,
+            "user": self.username,
+            "project": self.project,
+            "activity": self.activity,
+            "state": self.state,
+            "started": self.started.strftime("%Y-%m-%d %H:%M"),
+            "elapsed_seconds": int(self.elapsed(now) * 3600),
+        }
+
+
+def load_active(conn, user_id=None):
+    """Active timers via the state index, joined to their display names."""
+    q = (
+        select(
+            entries_table.c.id, entries_table.c.user_id, User.username, Project.name,
+            Activity.name, entries_table.c.state, entries_table.c.duration_hours,
+            entries_table.c.end_time, entries_table.c.start_time, entries_table.c.version,
+        )
+        .join(User, User.id == entries_table.c.user_id)
+        .join(Project, Project.id == entries_table.c.project_id)
+        .join(Activity, Activity.id == entries_table.c.activity_id)
+        .where(entries_table.c.state.in_(ACTIVE))
+        .order_by(entries_table.c.start_time)
+    )
+    if user_id is not None:
+        q = q.where(entries_table.c.user_id == user_id)
+    return [Timer(*row) for row in conn.execute(q)]
+
+
+class Registry:
+    """Per-process map user_id -> active Timer, plus its sync thread."""
+
+    def __init__(self):
+        self._timers = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure(self, app):
+        """Load the registry and start the sync thread once per process."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            try:
+                with app.app_context(), db.engine.connect() as conn:
+                    self._timers = {t.user_id: t for t in load_active(conn)}
+            except Exception:
+                # e.g. before `flask db upgrade`; the sync thread keeps retrying
+                app.logger.exception("could not load running timers")
+                self._timers = {}
+            self._pid = os.getpid()
+            threading.Thread(
+                target=self._run, args=(app,), name="timer-sync", daemon=True
+            ).start()
+
+    def for_user(self, user_id):
+        return self._timers.get(user_id)
+
+    def active(self, user_ids=None):
+        timers = list(self._timers.values())
+        if user_ids is not None:
+            timers = [t for t in timers if t.user_id in user_ids]
+        return sorted(timers, key=lambda t: t.username)
+
+    def refresh_user(self, user_id):
+        with db.engine.connect() as conn:
+            found = load_active(conn, user_id)
+        with self._lock:
+            if found:
+                self._timers[user_id] = found[-1]
+            else:
+                self._timers.pop(user_id, None)
+
+    def refresh(self):
+        with db.engine.connect() as conn:
+            timers = {t.user_id: t for t in load_active(conn)}
+        with self._lock:
+            self._timers = timers
+
+    def _run(self, app):
+        cfg = app.config
+        with app.app_context():
+            while True:
+                try:
+                    self._tick(cfg["TIMER_CHECKPOINT_SECONDS"], cfg["TIMER_STALE_AFTER"])
+                except Exception:
+                    app.logger.exception("timer sync failed")
+                time.sleep(cfg["TIMER_SYNC_SECONDS"])
+
+    def _tick(self, checkpoint, stale_after):
+        now = datetime.now()
+        due, stale = [], []
+        for t in list(self._timers.values()):
+            if t.state != RUNNING:
+                continue
+            idle = (now - t.since).total_seconds()
+            if idle >= stale_after:
+                stale.append(t)
+            elif idle >= checkpoint:
+                due.append(t)
+        if due or stale:
+            writer.run(_maintain, due, stale, now)
+        self.refresh()
+
+
+registry = Registry()
+
+
+def init_app(app):
+    @app.before_request
+    def _ensure_registry():
+        registry.ensure(app)
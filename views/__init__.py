@@ -0,0 +1,19 @@
+# views/__init__.py
+from functools import wraps
+
+from flask import abort
+from flask_login import current_user
+
+
+# Role-based decorator
+def role_required(role):
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if not current_user.is_authenticated or current_user.role != role:
+                abort(403)
+            return f(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
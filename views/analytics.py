@@ -0,0 +1,42 @@
+# views/analytics.py
+from flask import Blueprint, current_app, render_template, request, abort, jsonify
+from flask_login import login_required
+
+from views import role_required
+
+bp = Blueprint("analytics", __name__)
+
+
+# ----------------------------------------
+# Utilization Analytics (Admin)
+# ----------------------------------------
+def _report():
+    import analytics  # NumPy only when a report is requested
+
+    analytics.cache.ttl = current_app.config["ANALYTICS_CACHE_TTL"]
+    period = request.args.get("period") or analytics.current_quarter()
+    try:
+        analytics.parse_period(period)
+    except ValueError:
+        abort(400)
+    return analytics.utilization(
+        period,
+        approved_only=bool(request.args.get("approved")),
+        max_hours=current_app.config["ANALYTICS_MAX_DAY_HOURS"],
+    )
+
+
+@bp.route("/analytics/utilization")
+@login_required
+@role_required("ROLE_ADMIN")
+def utilization():
+    report = _report()
+    peak = max((max(u["daily"], default=0) for u in report["users"]), default=0)
+    return render_template("utilization.html", report=report, peak=peak or 1)
+
+
+@bp.route("/analytics/utilization.json")
+@login_required
+@role_required("ROLE_ADMIN")
+def utilization_json():
+    return jsonify(_report())
@@ -0,0 +1,215 @@
+# views/auth.py
+import click
+from flask import (
+    Blueprint,
+    current_app,
+    render_template,
+    redirect,
+    url_for,
+    request,
+    flash,
+)
+from flask_login import login_user, login_required, logout_user, current_user
+from werkzeug.security import generate_password_hash
+
+import writer
+from extensions import db
+from models import User
+from views import role_required
+
+# cli_group "users" -> `flask users import FILE`
+bp = Blueprint("auth", __name__, cli_group="users")
+
+
+# ----------------------------------------
+# Authentication & Approval
+# ----------------------------------------
+@bp.route("/")
+def index():
+    if current_user.is_authenticated:
+        return redirect(url_for("auth.home"))
+    return render_template("login.html")
+
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        uname = request.form.get("username", "").strip()
+        pwd = request.form.get("password", "")
+        if User.query.filter_by(username=uname).first():
+            flash("Username already exists.", "warning")
+        # hash here, not on the writer thread; the insert re-checks the name
+        elif writer.run(_create_user, uname, generate_password_hash(pwd)):
+            flash("Registered! Await admin approval.", "success")
+            return redirect(url_for("auth.login"))
+        else:
+            flash("Username already exists.", "warning")
+    return render_template("register.html")
+
+
+def _create_user(session, uname, password_hash):
+    if session.query(User.id).filter_by(username=uname).first():
+        return False
+    session.add(User(username=uname, password_hash=password_hash,
+                     role="ROLE_USER", is_approved=False))
+    return True
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        uname = request.form.get("username", "").strip()
+        pwd = request.form.get("password", "")
+        user = User.query.filter_by(username=uname).first()
+        if user and user.check_password(pwd):
+            if not user.is_approved:
+                flash("Account pending approval.", "warning")
+                return redirect(url_for("auth.login"))
+            login_user(user)
+            if user.role == "ROLE_ADMIN":
+                return redirect(url_for("auth.admin_dashboard"))
+            if user.role == "ROLE_TEAMLEAD":
+                return redirect(url_for("auth.lead_dashboard"))
+            return redirect(url_for("auth.user_dashboard"))
+        flash("Invalid credentials.", "danger")
+    return render_template("login.html")
+
+
+@bp.route("/logout")
+@login_required
+def logout():
+    logout_user()
+    flash("Logged out.", "info")
+    return redirect(url_for("auth.login"))
+
+
+# ----------------------------------------
+# Dashboards
+# ----------------------------------------
+@bp.route("/home")
+@login_required
+def home():
+    if current_user.role == "ROLE_ADMIN":
+        return redirect(url_for("auth.admin_dashboard"))
+    if current_user.role == "ROLE_TEAMLEAD":
+        return redirect(url_for("auth.lead_dashboard"))
+    return redirect(url_for("auth.user_dashboard"))
+
+
+@bp.route("/admin")
+@login_required
+@role_required("ROLE_ADMIN")
+def admin_dashboard():
+    return render_template("admin_dashboard.html", user=current_user)
+
+
+@bp.route("/lead")
+@login_required
+@role_required("ROLE_TEAMLEAD")
+def lead_dashboard():
+    return render_template("lead_dashboard.html", user=current_user)
+
+
+@bp.route("/dashboard")
+@login_required
+@role_required("ROLE_USER")
+def user_dashboard():
+    return render_template("user_dashboard.html", user=current_user)
+
+
+# ----------------------------------------
+# User Management & Approval (Admin)
+# ----------------------------------------
+@bp.route("/users")
+@login_required
+@role_required("ROLE_ADMIN")
+def list_users():
+    users = User.query.order_by(User.username).all()
+    return render_template("users.html", users=users)
+
+
+@bp.route("/users/new", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def new_user():
+    if request.method == "POST":
+        uname = request.form.get("username", "").strip()
+        pwd = request.form.get("password", "")
+        role = request.form.get("role", "ROLE_USER")
+        if User.query.filter_by(username=uname).first():
+            flash("Username already exists.", "warning")
+        else:
+            u = User(username=uname, role=role, is_approved=True)
+            u.set_password(pwd)
+            db.session.add(u)
+            db.session.commit()
+            flash("User created.", "success")
+            return redirect(url_for("auth.list_users"))
+    return render_template("user_form.html")
+
+
+@bp.route("/users/<int:id>/approve", methods=["POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def approve_user(id):
+    u = User.query.get_or_404(id)
+    u.is_approved = True
+    db.session.commit()
+    flash(f"User '{u.username}' approved.", "success")
+    return redirect(url_for("auth.list_users"))
+
+
+# Bulk provisioning from CSV/JSON (admin only)
+@bp.route("/users/import", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def import_users():
+    result = None
+    if request.method == "POST":
+        import provisioning  # process pool only when an upload arrives
+
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Choose a CSV or JSON file.", "warning")
+            return redirect(url_for("auth.import_users"))
+        dry_run = bool(request.form.get("dry_run"))
+        try:
+            rows = provisioning.parse_upload(upload.filename, upload.read())
+        except provisioning.ProvisioningError as exc:
+            flash(str(exc), "danger")
+            return redirect(url_for("auth.import_users"))
+        result = provisioning.provision(
+            rows, dry_run=dry_run, workers=current_app.config["PROVISION_WORKERS"]
+        )
+        if result["errors"]:
+            flash(f"{result['errors']} row(s) have errors; nothing was created.", "danger")
+        elif dry_run:
+            flash(f"Dry run: {len(rows)} user(s) would be created.", "info")
+        else:
+            flash(f"{result['created']} user(s) created.", "success")
+    return render_template("users_import.html", result=result)
+
+
+@bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="Validate and report without writing.")
+def import_users_command(path, dry_run):
+    """Create users (and team memberships) from a CSV or JSON file."""
+    import provisioning
+
+    with open(path, "rb") as fh:
+        try:
+            rows = provisioning.parse_upload(path, fh.read())
+        except provisioning.ProvisioningError as exc:
+            raise click.ClickException(str(exc))
+    result = provisioning.provision(
+        rows, dry_run=dry_run, workers=current_app.config["PROVISION_WORKERS"]
+    )
+    for line in result["rows"]:
+        click.echo(f"{line['row']:>5}  {line['status']:<12} {line['username']}  {line['message']}")
+    click.echo(
+        f"{len(rows)} rows, {result['created']} created, {result['errors']} errors"
+        + (" (dry run)" if dry_run else "")
+    )
+    if result["errors"]:
+        raise SystemExit(1)
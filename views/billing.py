@@ -0,0 +1,155 @@
+# views/billing.py
+import threading
+from datetime import datetime
+
+import click
+from flask import (
+    Blueprint,
+    current_app,
+    render_template,
+    redirect,
+    url_for,
+    request,
+    flash,
+    abort,
+    send_from_directory,
+)
+from flask_login import login_required
+
+from extensions import db
+from models import Customer
+from views import role_required
+
+# cli_group=None keeps the command at `flask invoices` instead of `flask billing invoices`
+bp = Blueprint("billing", __name__, cli_group=None)
+
+
+# ----------------------------------------
+# Month-end Invoices (Admin)
+# ----------------------------------------
+def _invoice_customers(customer_ids=None):
+    q = db.session.query(Customer.id, Customer.name).order_by(Customer.id)
+    if customer_ids:
+        q = q.filter(Customer.id.in_(customer_ids))
+    return [(cid, name) for cid, name in q.all()]
+
+
+def _run_invoice_period(period, force=False, customer_ids=None):
+    import invoices  # process pool + jinja env only when a run is requested
+
+    return invoices.run_invoices(
+        current_app.config["SQLALCHEMY_DATABASE_URI"],
+        _invoice_customers(customer_ids),
+        period,
+        current_app.config["INVOICE_DIR"],
+        workers=current_app.config["INVOICE_WORKERS"],
+        force=force,
+    )
+
+
+def _run_in_background(app, period, force):
+    import invoices
+
+    with app.app_context():
+        try:
+            _run_invoice_period(period, force=force)
+        except Exception:
+            app.logger.exception("invoice run for %s failed", period)
+        finally:
+            invoices.release_run(app.config["INVOICE_DIR"], period)
+
+
+def _valid_period(period):
+    try:
+        datetime.strptime(period, "%Y-%m")
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _last_month():
+    today = datetime.now().date().replace(day=1)
+    if today.month == 1:
+        return f"{today.year - 1}-12"
+    return f"{today.year}-{today.month - 1:02d}"
+
+
+@bp.route("/invoices")
+@login_required
+@role_required("ROLE_ADMIN")
+def list_invoices():
+    import invoices
+
+    period = request.args.get("period") or _last_month()
+    if not _valid_period(period):
+        abort(400)
+    out_dir = current_app.config["INVOICE_DIR"]
+    return render_template(
+        "invoices.html",
+        period=period,
+        summary=invoices.load_summary(out_dir, period),
+        running=invoices.run_status(out_dir, period),
+    )
+
+
+@bp.route("/invoices/run", methods=["POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def run_invoices_view():
+    import invoices
+
+    period = request.form.get("period", "")
+    if not _valid_period(period):
+        flash("Period must look like YYYY-MM.", "danger")
+        return redirect(url_for("billing.list_invoices"))
+    # a run can take minutes: do it off the request, the page shows progress
+    if not invoices.claim_run(current_app.config["INVOICE_DIR"], period):
+        flash(f"Invoices for {period} are already being generated.", "warning")
+        return redirect(url_for("billing.list_invoices", period=period))
+    threading.Thread(
+        target=_run_in_background,
+        args=(current_app._get_current_object(), period, bool(request.form.get("force"))),
+        name=f"invoices-{period}",
+        daemon=True,
+    ).start()
+    flash(f"Generating invoices for {period}; refresh for the results.", "info")
+    return redirect(url_for("billing.list_invoices", period=period))
+
+
+@bp.route("/invoices/<period>/<int:customer_id>.<fmt>")
+@login_required
+@role_required("ROLE_ADMIN")
+def invoice_file(period, customer_id, fmt):
+    if fmt not in ("csv", "html") or not _valid_period(period):
+        abort(404)
+    return send_from_directory(
+        current_app.config["INVOICE_DIR"],
+        f"{period}/customer_{customer_id}.{fmt}",
+    )
+
+
+@bp.cli.command("invoices")
+@click.argument("period", required=False)
+@click.option("--customer", "customer_ids", type=int, multiple=True, help="Only these customer ids.")
+@click.option("--force", is_flag=True, help="Rebuild customers that already finished.")
+def invoices_command(period, customer_ids, force):
+    """Generate month-end statements for PERIOD (YYYY-MM, default last month)."""
+    import invoices
+
+    period = period or _last_month()
+    if not _valid_period(period):
+        raise click.BadParameter("expected YYYY-MM", param_hint="PERIOD")
+    out_dir = current_app.config["INVOICE_DIR"]
+    if not invoices.claim_run(out_dir, period):
+        raise click.ClickException(f"a run for {period} is already in progress")
+    try:
+        summary = _run_invoice_period(period, force=force, customer_ids=customer_ids)
+    finally:
+        invoices.release_run(out_dir, period)
+    click.echo(
+        f"{period}: {summary['customers']} customers, {summary['written']} written, "
+        f"{summary['skipped']} skipped, {summary['failed']} failed, "
+        f"{summary['hours']:.2f}h in {summary['seconds']}s"
+    )
+    for f in summary["failures"]:
+        click.echo(f"  failed {f['customer']} ({f['customer_id']}): {f['error']}", err=True)
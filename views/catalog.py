@@ -0,0 +1,83 @@
+# views/catalog.py
+from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask_login import login_required
+
+from extensions import db
+from models import Customer, Project, Activity
+from views import role_required
+
+bp = Blueprint("catalog", __name__)
+
+
+# ----------------------------------------
+# Customer, Project & Activity CRUD (Admin)
+# ----------------------------------------
+@bp.route("/customers")
+@login_required
+@role_required("ROLE_ADMIN")
+def list_customers():
+    customers = Customer.query.order_by(Customer.name).all()
+    return render_template("customers.html", customers=customers)
+
+
+@bp.route("/customers/new", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def new_customer():
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        if name:
+            db.session.add(Customer(name=name))
+            db.session.commit()
+            flash("Customer created.", "success")
+            return redirect(url_for("catalog.list_customers"))
+    return render_template("customer_form.html")
+
+
+@bp.route("/projects")
+@login_required
+@role_required("ROLE_ADMIN")
+def list_projects():
+    projects = Project.query.order_by(Project.name).all()
+    return render_template("projects.html", projects=projects)
+
+
+@bp.route("/projects/new", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def new_project():
+    customers = Customer.query.filter_by(is_active=True).all()
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        cid = request.form.get("customer_id")
+        if name and cid:
+            db.session.add(Project(name=name, customer_id=int(cid)))
+            db.session.commit()
+            flash("Project created.", "success")
+            return redirect(url_for("catalog.list_projects"))
+    return render_template("project_form.html", customers=customers)
+
+
+@bp.route("/activities")
+@login_required
+@role_required("ROLE_ADMIN")
+def list_activities():
+    activities = Activity.query.order_by(Activity.name).all()
+    return render_template("activities.html", activities=activities)
+
+
+@bp.route("/activities/new", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def new_activity():
+    projects = Project.query.filter_by(is_active=True).all()
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        pid = request.form.get("project_id")
+        bill = bool(request.form.get("is_billable"))
+        if name and pid:
+            db.session.add(Activity(name=name, project_id=int(pid), is_billable=bill))
+            db.session.commit()
+            flash("Activity created.", "success")
+            return redirect(url_for("catalog.list_activities"))
+    return render_template("activity_form.html", projects=projects)
@@ -0,0 +1,316 @@
+# views/entries.py
+from datetime import date, datetime, timedelta
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    render_template,
+    redirect,
+    url_for,
+    abort,
+    request,
+    flash,
+    jsonify,
+)
+from flask_login import login_required, current_user
+from sqlalchemy import func
+from werkzeug.exceptions import NotFound
+
+import events
+import search
+import timers
+import weekly
+import writer
+from extensions import db
+from models import User, Activity, TimesheetEntry, Team, team_members
+from views import role_required
+
+bp = Blueprint("entries", __name__)
+
+
+# ----------------------------------------
+# Timesheet Entries
+# ----------------------------------------
+@bp.route("/entries")
+@login_required
+@role_required("ROLE_USER")
+def list_my_entries():
+    entries = (
+        TimesheetEntry.query.filter_by(user_id=current_user.id)
+        .order_by(TimesheetEntry.start_time.desc())
+        .all()
+    )
+    timer = timers.registry.for_user(current_user.id)
+    return render_template(
+        "entries.html",
+        entries=entries,
+        timer=timer.as_dict(datetime.now()) if timer else None,
+    )
+
+
+@bp.route("/entries/new", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_USER")
+def new_entry():
+    # activities are looked up as the user types, see activity_search()
+    if request.method == "POST":
+        s = datetime.fromisoformat(request.form["start_time"])
+        e = datetime.fromisoformat(request.form["end_time"])
+        act_id = request.form.get("activity_id", type=int)
+        desc = request.form.get("description", "")
+        bill = bool(request.form.get("is_billable"))
+        dur = (e - s).total_seconds() / 3600
+        activity = Activity.query.get(act_id) if act_id else None
+        if activity is None or activity.is_active is False:
+            flash("Pick an activity from the list.", "warning")
+            return render_template("entry_form.html"), 400
+        proj_id = activity.project_id
+
+        writer.run(
+            _add_entry,
+            user_id=current_user.id,
+            project_id=proj_id,
+            activity_id=act_id,
+            start_time=s,
+            end_time=e,
+            duration_hours=dur,
+            is_billable=bill,
+            description=desc,
+            is_approved=False,
+        )
+        flash("Entry created.", "success")
+        return redirect(url_for("entries.list_my_entries"))
+    return render_template("entry_form.html")
+
+
+def _add_entry(session, **fields):
+    entry = TimesheetEntry(**fields)
+    session.add(entry)
+    session.flush()
+    return entry.id
+
+
+# Typeahead for the entry form: ?q=<words>&limit=N
+@bp.route("/entries/activities/search")
+@login_required
+@role_required("ROLE_USER")
+def activity_search():
+    cfg = current_app.config
+    search.index.ttl = cfg["TYPEAHEAD_INDEX_TTL"]
+    limit = min(request.args.get("limit", cfg["TYPEAHEAD_LIMIT"], type=int), 50)
+    results = search.suggest(
+        current_user.id,
+        request.args.get("q", "")[:100],
+        max(limit, 1),
+        recent_days=cfg["TYPEAHEAD_RECENT_DAYS"],
+        scope_ttl=cfg["TYPEAHEAD_SCOPE_TTL"],
+    )
+    return jsonify(results=results)
+
+
+# Weekly grid: whole week loaded in one query, saved in one transaction
+def _monday(value):
+    try:
+        day = date.fromisoformat(value) if value else None
+    except ValueError:
+        day = None
+    return weekly.week_start(day)
+
+
+@bp.route("/entries/week")
+@login_required
+@role_required("ROLE_USER")
+def week_grid():
+    monday = _monday(request.args.get("start"))
+    week = weekly.serialize(weekly.load_week(current_user.id, monday))
+    days = [monday + timedelta(days=i) for i in range(7)]
+    return render_template(
+        "entries_week.html",
+        monday=monday,
+        days=days,
+        week=week,
+        prev_week=monday - timedelta(days=7),
+        next_week=monday + timedelta(days=7),
+    )
+
+
+@bp.route("/entries/week", methods=["POST"])
+@login_required
+@role_required("ROLE_USER")
+def save_week():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify(error="Expected a JSON object."), 400
+    monday = _monday(payload.get("start"))
+    try:
+        counts = weekly.save_week(
+            current_user.id,
+            monday,
+            payload.get("changes") or [],
+            day_start_hour=current_app.config["WEEK_GRID_DAY_START_HOUR"],
+        )
+    except weekly.WeekConflict as exc:
+        return jsonify(error=str(exc), conflicts=[f"{a}:{d}" for a, d in exc.cells]), 409
+    except weekly.WeekError as exc:
+        return jsonify(error=str(exc)), 400
+    week = weekly.serialize(weekly.load_week(current_user.id, monday))
+    return jsonify(saved=counts, week=week)
+
+
+@bp.route("/entries/pending")
+@login_required
+@role_required("ROLE_TEAMLEAD")
+def pending_entries():
+    # only entries from members of the teams this lead runs
+    team_ids = [t.id for t in Team.query.filter_by(lead_id=current_user.id)]
+    members = db.session.query(team_members.c.user_id).filter(
+        team_members.c.team_id.in_(team_ids)
+    )
+    entries = (
+        TimesheetEntry.query.filter(
+            TimesheetEntry.is_approved.is_(False),
+            TimesheetEntry.user_id.in_(members),
+            # live timers are submitted when stopped
+            func.coalesce(TimesheetEntry.state, timers.STOPPED) == timers.STOPPED,
+        )
+        .order_by(TimesheetEntry.start_time.desc())
+        .all()
+    )
+    return render_template("entries_pending.html", entries=entries)
+
+
+# Live timer: start (or resume), pause, stop. Form posts redirect back to
+# My Entries; fetch() callers asking for JSON get the timer as JSON.
+def _timer_response(error=None, status=200):
+    if request.accept_mimetypes.best == "application/json":
+        timer = timers.registry.for_user(current_user.id)
+        if error:
+            return jsonify(error=error), status
+        return jsonify(timer=timer.as_dict(datetime.now()) if timer else None)
+    if error:
+        flash(error, "warning")
+    return redirect(url_for("entries.list_my_entries"))
+
+
+def _run_timer(fn, *args):
+    try:
+        writer.run(fn, current_user.id, *args)
+    except timers.TimerError as exc:
+        return _timer_response(str(exc), 400)
+    except timers.TimerConflict:
+        return _timer_response("The timer changed in another window; try again.", 409)
+    finally:
+        timers.registry.refresh_user(current_user.id)
+    return _timer_response()
+
+
+@bp.route("/entries/timer")
+@login_required
+@role_required("ROLE_USER")
+def timer_status():
+    timer = timers.registry.for_user(current_user.id)
+    return jsonify(timer=timer.as_dict(datetime.now()) if timer else None)
+
+
+@bp.route("/entries/timer/start", methods=["POST"])
+@login_required
+@role_required("ROLE_USER")
+def timer_start():
+    # no activity: resume the paused timer
+    act_id = request.form.get("activity_id", type=int)
+    if act_id is None:
+        return _run_timer(timers.resume, datetime.now())
+    return _run_timer(
+        timers.start, act_id, datetime.now(), request.form.get("description", "")
+    )
+
+
+@bp.route("/entries/timer/pause", methods=["POST"])
+@login_required
+@role_required("ROLE_USER")
+def timer_pause():
+    return _run_timer(timers.pause, datetime.now())
+
+
+@bp.route("/entries/timer/stop", methods=["POST"])
+@login_required
+@role_required("ROLE_USER")
+def timer_stop():
+    return _run_timer(timers.stop, datetime.now())
+
+
+# Running now: active timers from the in-process registry (team leads see
+# their teams' members, admins everyone)
+@bp.route("/entries/running")
+@login_required
+def running_now():
+    if current_user.role == "ROLE_ADMIN":
+        user_ids = None
+    elif current_user.role == "ROLE_TEAMLEAD":
+        team_ids = [t.id for t in Team.query.filter_by(lead_id=current_user.id)]
+        user_ids = {
+            uid
+            for (uid,) in db.session.query(team_members.c.user_id).filter(
+                team_members.c.team_id.in_(team_ids)
+            )
+        }
+    else:
+        abort(403)
+    now = datetime.now()
+    active = [t.as_dict(now) for t in timers.registry.active(user_ids)]
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(timers=active)
+    return render_template("entries_running.html", timers=active)
+
+
+# Live feed for pending_entries: new entries and approvals on the lead's teams
+@bp.route("/entries/pending/stream")
+@login_required
+@role_required("ROLE_TEAMLEAD")
+def pending_stream():
+    team_ids = [t.id for t in Team.query.filter_by(lead_id=current_user.id)]
+    last_id = request.headers.get("Last-Event-ID", type=int)
+    sub = events.broker.subscribe(current_app._get_current_object(), team_ids, last_id)
+    # release the request's DB connection: the stream may stay open for hours
+    db.session.remove()
+    return Response(
+        events.stream(sub, current_app.config["SSE_KEEPALIVE"]),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.route("/entries/<int:id>/approve", methods=["POST"])
+@login_required
+@role_required("ROLE_TEAMLEAD")
+def approve_entry(id):
+    writer.run(_approve, id)
+    flash("Entry approved.", "success")
+    return redirect(url_for("entries.pending_entries"))
+
+
+def _approve(session, entry_id):
+    entry = session.get(TimesheetEntry, entry_id)
+    if entry is None:
+        raise NotFound()
+    entry.is_approved = True
+
+
+@bp.route("/entries/all")
+@login_required
+@role_required("ROLE_ADMIN")
+def all_entries():
+    entries = TimesheetEntry.query.order_by(TimesheetEntry.start_time.desc()).all()
+    return render_template("entries_all.html", entries=entries)
+
+@bp.route("/entries/all_lead")
+@login_required
+@role_required("ROLE_TEAMLEAD")
+def all_entries_lead():
+    user = User.query.all()
+    team = Team.query.all()
+    print(user[0].__dict__)
+    entries = TimesheetEntry.query.order_by(TimesheetEntry.start_time.desc()).all()
+    print(list(entries)[0].__dict__)
+    return render_template("entries_all.html", entries=entries)
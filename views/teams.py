@@ -0,0 +1,138 @@
+# views/teams.py
+from flask import (
+    Blueprint,
+    current_app,
+    render_template,
+    redirect,
+    url_for,
+    request,
+    flash,
+    abort,
+)
+from flask_login import login_required, current_user
+
+import membership
+import writer
+from extensions import db
+from models import User, TimesheetEntry, Team
+from views import role_required
+
+bp = Blueprint("teams", __name__)
+
+
+# ----------------------------------------
+# Teams Feature (Admin & TeamLead)
+# ----------------------------------------
+
+
+# List all teams (admin only)
+@bp.route("/teams")
+@login_required
+@role_required("ROLE_ADMIN")
+def list_teams():
+    teams = Team.query.order_by(Team.name).all()
+    membership.counts.ttl = current_app.config["TEAM_COUNTS_TTL"]
+    counts = membership.counts.get()
+    return render_template("teams.html", teams=teams, counts=counts)
+
+
+# Create a new team (admin only)
+@bp.route("/teams/new", methods=["GET", "POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def new_team():
+    leads = User.query.filter_by(role="ROLE_TEAMLEAD", is_approved=True).all()
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        lead_id = int(request.form.get("lead_id", 0))
+        if name and lead_id:
+            t = Team(name=name, lead_id=lead_id)
+            db.session.add(t)
+            db.session.commit()
+            flash("Team created.", "success")
+            return redirect(url_for("teams.list_teams"))
+    return render_template("team_form.html", leads=leads)
+
+
+# Delete a team (admin only)
+@bp.route("/teams/<int:id>/delete", methods=["POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def delete_team(id):
+    t = Team.query.get_or_404(id)
+    db.session.delete(t)
+    db.session.commit()
+    flash("Team deleted.", "success")
+    return redirect(url_for("teams.list_teams"))
+
+
+# View & manage members of a team (admin & that team’s lead)
+# ?q=/page= page through candidates, ?mq=/mpage= through current members
+@bp.route("/teams/<int:id>/members")
+@login_required
+def list_team_members(id):
+    t = Team.query.get_or_404(id)
+    # Only admin or that team’s lead may manage
+    if not (current_user.role == "ROLE_ADMIN" or current_user.id == t.lead_id):
+        abort(403)
+
+    per_page = current_app.config["TEAM_PICKER_PAGE_SIZE"]
+    membership.counts.ttl = current_app.config["TEAM_COUNTS_TTL"]
+    members = membership.members(
+        id, request.args.get("mq", "").strip(), request.args.get("mpage", 1, type=int), per_page
+    )
+    available = membership.candidates(
+        id, request.args.get("q", "").strip(), request.args.get("page", 1, type=int), per_page
+    )
+    return render_template(
+        "team_members.html", team=t, members=members, available=available,
+        count=membership.counts.get().get(id, 0),
+    )
+
+
+def _user_ids():
+    try:
+        return [int(u) for u in request.form.getlist("user_id") if u]
+    except ValueError:
+        abort(400)
+
+
+# Add members to team (admin only); one or many user_id values
+@bp.route("/teams/<int:id>/members/add", methods=["POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def add_member(id):
+    added = writer.run(membership.add_members, id, _user_ids())
+    if added is None:
+        abort(404)
+    flash(f"{added} member(s) added to team.", "success")
+    return redirect(url_for("teams.list_team_members", id=id, q=request.form.get("q", "")))
+
+
+# Remove members from team (admin only); one or many user_id values
+@bp.route("/teams/<int:id>/members/remove", methods=["POST"])
+@login_required
+@role_required("ROLE_ADMIN")
+def remove_member(id):
+    removed = writer.run(membership.remove_members, id, _user_ids())
+    if removed is None:
+        abort(404)
+    flash(f"{removed} member(s) removed.", "info")
+    return redirect(url_for("teams.list_team_members", id=id, mq=request.form.get("mq", "")))
+
+
+# Team-lead: view all timesheet entries for users on their team
+@bp.route("/teams/<int:id>/entries")
+@login_required
+@role_required("ROLE_TEAMLEAD")
+def team_entries(id):
+    t = Team.query.get_or_404(id)
+    if current_user.id != t.lead_id:
+        abort(403)
+    user_ids = [u.id for u in t.members]
+    entries = (
+        TimesheetEntry.query.filter(TimesheetEntry.user_id.in_(user_ids))
+        .order_by(TimesheetEntry.start_time.desc())
+        .all()
+    )
+    return render_template("team_entries.html", team=t, entries=entries)
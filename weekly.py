@@ -0,0 +1,227 @@
+# weekly.py
+# Weekly timesheet grid: one query to load a user's week, one transaction to
+# save every added, changed and deleted cell.
+#
+# A cell is (activity, day) and maps to a single entry. Saves are diffed
+# against what the client loaded and guarded by TimesheetEntry.version, so
+# a week edited in two tabs fails loudly instead of losing hours.
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, bindparam, delete, func, insert, update
+
+import events
+from extensions import db
+from models import Activity, Project, TimesheetEntry
+
+entries_table = TimesheetEntry.__table__
+
+
+class WeekConflict(Exception):
+    """Some cells changed since the client loaded the week."""
+
+    def __init__(self, cells):
+        super().__init__(f"{len(cells)} cell(s) changed since the week was loaded")
+        self.cells = cells
+
+
+class WeekError(ValueError):
+    """The submitted changes are malformed or not allowed."""
+
+
+def week_start(day=None):
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+
+def load_week(user_id, monday):
+    """The user's entries for the week starting `monday`, in one query.
+
+    Returns {"rows": [...], "cells": {(activity_id, day): cell}} where a
+    cell holding several entries (logged through the single-entry form), an
+    approved entry or a live timer is marked read-only.
+    """
+    start = datetime.combine(monday, datetime.min.time())
+    q = (
+        db.session.query(
+            TimesheetEntry.id, TimesheetEntry.activity_id, TimesheetEntry.start_time,
+            TimesheetEntry.duration_hours, TimesheetEntry.is_approved,
+            TimesheetEntry.state, TimesheetEntry.version, Activity.name, Project.name,
+        )
+        .join(Activity, Activity.id == TimesheetEntry.activity_id)
+        .join(Project, Project.id == TimesheetEntry.project_id)
+        .filter(
+            TimesheetEntry.user_id == user_id,
+            TimesheetEntry.start_time >= start,
+            TimesheetEntry.start_time < start + timedelta(days=7),
+        )
+        .order_by(Project.name, Activity.name, TimesheetEntry.start_time)
+    )
+    rows, cells = {}, {}
+    for eid, aid, s, hours, approved, state, version, activity, project in q:
+        rows.setdefault(aid, {"activity_id": aid, "activity": activity, "project": project})
+        key = (aid, (s.date() - monday).days)
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = {
+                "activity_id": aid,
+                "day": key[1],
+                "entry_id": eid,
+                "version": version,
+                "hours": round(hours, 2),
+                # a running/paused timer's row belongs to the timer until stopped
+                "locked": bool(approved) or (state or "stopped") != "stopped",
+                "start": s,
+            }
+        else:
+            # several entries in one cell: show the total, edit elsewhere
+            cell.update(entry_id=None, version=None, locked=True)
+            cell["hours"] = round(cell["hours"] + hours, 2)
+    return {"rows": list(rows.values()), "cells": cells}
+
+
+def _parse_change(raw):
+    try:
+        change = {
+            "activity_id": int(raw["activity_id"]),
+            "day": int(raw["day"]),
+            "hours": float(raw.get("hours") or 0),
+            "entry_id": int(raw["entry_id"]) if raw.get("entry_id") else None,
+            "version": int(raw["version"]) if raw.get("version") else None,
+        }
+    except (KeyError, TypeError, ValueError):
+        raise WeekError("Malformed cell.")
+    if not 0 <= change["day"] <= 6:
+        raise WeekError("Day must be 0-6.")
+    if not 0 <= change["hours"] <= 24:
+        raise WeekError("Hours must be between 0 and 24.")
+    return change
+
+
+def _guarded(stmt, cells, extra):
+    """executemany `stmt` (id + version guarded); any missed row is a conflict."""
+    params = [dict(extra(c), b_id=c["entry_id"], b_version=c["version"]) for c in cells]
+    if db.session.get_bind().dialect.supports_sane_multi_rowcount:
+        matched = db.session.execute(stmt, params).rowcount
+    else:
+        matched = sum(db.session.execute(stmt, p).rowcount for p in params)
+    if matched != len(cells):
+        raise WeekConflict([(c["activity_id"], c["day"]) for c in cells])
+
+
+def save_week(user_id, monday, changes, day_start_hour=9):
+    """Apply changed cells in one transaction; returns counts.
+
+    `changes` are the cells the client edited, each carrying the entry_id and
+    version it loaded (none for a new cell). Raises WeekConflict (nothing
+    written) when any of them no longer matches the database.
+    """
+    changes = [_parse_change(c) for c in changes]
+    keys = [(c["activity_id"], c["day"]) for c in changes]
+    if len(set(keys)) != len(keys):
+        raise WeekError("Each cell may appear once.")
+
+    current = load_week(user_id, monday)["cells"]
+    inserts, updates, deletes, conflicts = [], [], [], []
+    for c, key in zip(changes, keys):
+        cell = current.get(key)
+        if c["entry_id"] is None:
+            if cell is not None:
+                conflicts.append(key)  # someone filled it meanwhile
+            elif c["hours"] > 0:
+                inserts.append(c)
+            continue
+        if cell is None or cell["entry_id"] != c["entry_id"] or cell["version"] != c["version"]:
+            conflicts.append(key)
+        elif cell["locked"]:
+            raise WeekError("Approved entries and running timers cannot be changed here.")
+        elif c["hours"] == 0:
+            deletes.append(c)
+        elif c["hours"] != cell["hours"]:
+            updates.append(c)
+    if conflicts:
+        db.session.rollback()
+        raise WeekConflict(conflicts)
+
+    acts = {}
+    if inserts:
+        ids = {c["activity_id"] for c in inserts}
+        acts = {
+            a.id: a
+            for a in Activity.query.filter(Activity.id.in_(ids), Activity.is_active.isnot(False))
+        }
+        if len(acts) != len(ids):
+            raise WeekError("Unknown or inactive activity.")
+
+    base = datetime.combine(monday, datetime.min.time()) + timedelta(hours=day_start_hour)
+    try:
+        if inserts:
+            rows = []
+            for c in inserts:
+                s = base + timedelta(days=c["day"])
+                act = acts[c["activity_id"]]
+                rows.append({
+                    "user_id": user_id,
+                    "project_id": act.project_id,
+                    "activity_id": act.id,
+                    "start_time": s,
+                    "end_time": s + timedelta(hours=c["hours"]),
+                    "duration_hours": c["hours"],
+                    "is_billable": act.is_billable is not False,
+                    "is_approved": False,
+                    "state": "stopped",
+                    "version": 1,
+                })
+            new_ids = db.session.execute(
+                insert(TimesheetEntry).returning(TimesheetEntry.id), rows
+            ).scalars().all()
+            events.record(
+                db.session,
+                [{"kind": "created", "entry_id": eid, "user_id": user_id} for eid in new_ids],
+            )
+
+        guard = and_(
+            entries_table.c.id == bindparam("b_id"),
+            entries_table.c.version == bindparam("b_version"),
+            entries_table.c.user_id == user_id,
+            entries_table.c.is_approved.is_(False),
+            func.coalesce(entries_table.c.state, "stopped") == "stopped",
+        )
+        if updates:
+            # end moves with the new duration; start (and the day) stay put
+            _guarded(
+                update(entries_table).where(guard).values(
+                    end_time=bindparam("b_end"),
+                    duration_hours=bindparam("b_hours"),
+                    version=entries_table.c.version + 1,
+                ),
+                updates,
+                lambda c: {
+                    "b_end": current[(c["activity_id"], c["day"])]["start"]
+                    + timedelta(hours=c["hours"]),
+                    "b_hours": c["hours"],
+                },
+            )
+        if deletes:
+            _guarded(delete(entries_table).where(guard), deletes, lambda c: {})
+            # bulk delete bypasses the flush hook; pending pages drop the rows
+            events.record(
+                db.session,
+                [{"kind": "deleted", "entry_id": c["entry_id"], "user_id": user_id}
+                 for c in deletes],
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes)}
+
+
+def serialize(week):
+    """load_week() result -> JSON-friendly dict (cell keys as "activity:day")."""
+    return {
+        "rows": week["rows"],
+        "cells": {
+            f"{aid}:{day}": {k: v for k, v in cell.items() if k != "start"}
+            for (aid, day), cell in week["cells"].items()
+        },
+    }
@@ -0,0 +1,172 @@
+# writer.py
+# Optional single-writer mode for SQLite (WRITE_COALESCING = True).
+#
+# Views hand their write to run(fn, *args): fn(session, *args) does the
+# inserts/updates and returns a plain value. Normally it runs right away on
+# db.session and commits. In coalescing mode it is queued instead; one writer
+# thread per process takes whatever has queued up within WRITE_QUEUE_WINDOW_MS,
+# runs each job in its own SAVEPOINT inside one transaction, commits once and
+# resolves every caller's Future. Requests stop fighting over the database
+# write lock, and N commits cost one fsync.
+#
+# pysqlite never emits BEGIN itself (each SAVEPOINT would then open and commit
+# a transaction of its own), so on a SQLite file the writer commits through a
+# private engine whose connections leave BEGIN to SQLAlchemy and open every
+# batch with BEGIN IMMEDIATE, taking the write lock up front. db.engine keeps
+# pysqlite's own handling, so requests that still commit directly never hold
+# a read snapshot they would have to upgrade.
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from extensions import db
+
+
+class WriteQueue:
+    def __init__(self, app):
+        self.app = app
+        self.window = app.config["WRITE_QUEUE_WINDOW_MS"] / 1000.0
+        self.max_batch = app.config["WRITE_QUEUE_MAX_BATCH"]
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.engine = None
+
+    def submit(self, fn, *args, **kwargs):
+        fut = Future()
+        self._ensure_thread()
+        self._jobs.put((fut, fn, args, kwargs))
+        return fut
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                # per process: a forked child must not share the parent's pool
+                with self.app.app_context():
+                    self.engine = _writer_engine()
+                self._thread = threading.Thread(
+                    target=self._run, name="db-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _take_batch(self):
+        batch = [self._jobs.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._jobs.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._take_batch()
+                try:
+                    self._commit_batch(batch)
+                except Exception:
+                    self.app.logger.exception("write batch failed")
+
+    def _commit_batch(self, batch):
+        session = Session(bind=self.engine)
+        done = []
+        try:
+            for fut, fn, args, kwargs in batch:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                savepoint = session.begin_nested()
+                try:
+                    result = fn(session, *args, **kwargs)
+                    savepoint.commit()
+                    done.append((fut, result))
+                except BaseException as exc:
+                    savepoint.rollback()
+                    fut.set_exception(exc)
+            # the one COMMIT for the batch; until it succeeds nothing is durable
+            session.commit()
+        except BaseException as exc:
+            session.rollback()
+            for fut, _ in done:
+                fut.set_exception(exc)
+            raise
+        finally:
+            session.close()
+        for fut, result in done:
+            fut.set_result(result)
+
+
+def run(fn, *args, **kwargs):
+    """Run fn(session, *args, **kwargs) as a committed write and return its result.
+
+    Exceptions raised by fn propagate to the caller; the write is rolled back.
+    """
+    wq = current_app.extensions.get("write_queue")
+    if wq is None:
+        try:
+            result = fn(db.session, *args, **kwargs)
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            raise
+        return result
+    # release this request's read transaction so it doesn't hold up the writer
+    db.session.rollback()
+    return wq.submit(fn, *args, **kwargs).result(
+        timeout=current_app.config["WRITE_QUEUE_TIMEOUT"]
+    )
+
+
+def _sqlite_pragmas(dbapi_conn, record):
+    cur = dbapi_conn.cursor()
+    # WAL: readers never wait for the writer, and the writer never waits for readers
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
+def _writer_connect(dbapi_conn, record):
+    # hand BEGIN to SQLAlchemy (_begin_immediate) instead of pysqlite
+    dbapi_conn.isolation_level = None
+    _sqlite_pragmas(dbapi_conn, record)
+
+
+def _begin_immediate(conn):
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _writer_engine():
+    """The engine the writer thread commits through.
+
+    A private engine on a SQLite file; otherwise db.engine (an in-memory
+    database has no second connection to open).
+    """
+    engine = db.engine
+    if engine.dialect.name != "sqlite" or engine.url.database in (None, "", ":memory:"):
+        return engine
+    writer = create_engine(engine.url)
+    event.listen(writer, "connect", _writer_connect)
+    event.listen(writer, "begin", _begin_immediate)
+    return writer
+
+
+def init_app(app):
+    if not app.config["WRITE_COALESCING"]:
+        return
+    app.extensions["write_queue"] = WriteQueue(app)
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", _sqlite_pragmas)